@@ -1,11 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import os
+import queue
+import re
 import subprocess
 import threading
 import time
 from pathlib import Path
 
+# 匹配 .env 中的 KEY=VALUE 行（忽略注释和空行）
+ENV_LINE_PATTERN = re.compile(r'^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=(.*)$', re.M)
+
+LOG_QUEUE_SIZE = 1024  # 日志队列最大行数
+LOG_PUMP_INTERVAL_MS = 100  # 日志刷新间隔（毫秒）
+LOG_PUMP_BATCH = 200  # 每次刷新最多显示的行数
+MAX_LOG_LINES = 1000  # 日志区域最多保留的行数
+
 class ControlUI:
     def __init__(self):
         self.root = tk.Tk()
@@ -14,6 +24,15 @@ class ControlUI:
         
         # 主程序进程
         self.main_process = None
+
+        # 解析后的 .env 内容，保存时直接复用
+        self._env_cache: dict = {}
+        
+        # 子进程输出队列，由 GUI 线程定时批量取出显示
+        self._log_q = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        
+        # 构建界面和填充配置期间先隐藏窗口，最后统一计算一次布局再显示
+        self.root.withdraw()
         
         # 创建界面
         self.create_widgets()
@@ -21,6 +40,12 @@ class ControlUI:
         # 加载现有配置
         self.load_config()
         
+        self.root.update_idletasks()
+        self.root.deiconify()
+        
+        # 启动日志刷新
+        self.root.after(LOG_PUMP_INTERVAL_MS, self._pump_queue)
+        
     def create_widgets(self):
         # 标题
         title_label = tk.Label(self.root, text="Whisper Input 控制面板", 
@@ -33,12 +58,12 @@ class ControlUI:
         
         # SILICONFLOW API Key
         tk.Label(config_frame, text="SILICONFLOW API Key:").pack(anchor="w")
-        self.api_key_entry = tk.Entry(config_frame, width=50, show="*")
+        self.api_key_entry = ttk.Entry(config_frame, width=50, show="*")
         self.api_key_entry.pack(fill="x", pady=(0, 10))
         
         # GROQ API Key
         tk.Label(config_frame, text="GROQ API Key:").pack(anchor="w")
-        self.groq_key_entry = tk.Entry(config_frame, width=50, show="*")
+        self.groq_key_entry = ttk.Entry(config_frame, width=50, show="*")
         self.groq_key_entry.pack(fill="x", pady=(0, 10))
         
         # 保存配置按钮
@@ -68,6 +93,14 @@ class ControlUI:
                                     font=("Arial", 10))
         self.status_label.pack(pady=10)
         
+        # 运行日志
+        log_frame = ttk.LabelFrame(self.root, text="运行日志", padding=10)
+        log_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        self.log_display = scrolledtext.ScrolledText(log_frame, height=8,
+                                                    wrap=tk.WORD, state="disabled")
+        self.log_display.pack(fill="both", expand=True)
+        
         # 使用说明
         help_frame = ttk.LabelFrame(self.root, text="使用说明", padding=10)
         help_frame.pack(fill="both", expand=True, padx=20, pady=10)
@@ -96,29 +129,26 @@ class ControlUI:
         """加载现有的 .env 配置"""
         env_path = Path(".env")
         if env_path.exists():
-            with open(env_path, 'r') as f:
-                for line in f:
-                    if line.startswith("SILICONFLOW_API_KEY="):
-                        key = line.split("=", 1)[1].strip().strip('"')
-                        self.api_key_entry.insert(0, key)
-                    elif line.startswith("GROQ_API_KEY="):
-                        key = line.split("=", 1)[1].strip().strip('"')
-                        self.groq_key_entry.insert(0, key)
+            text = env_path.read_text()
+            self._env_cache = {
+                key: value.strip()
+                for key, value in ENV_LINE_PATTERN.findall(text)
+            }
+
+        siliconflow_key = self._env_cache.get("SILICONFLOW_API_KEY")
+        if siliconflow_key:
+            self.api_key_entry.insert(0, siliconflow_key.strip('"'))
+        groq_key = self._env_cache.get("GROQ_API_KEY")
+        if groq_key:
+            self.groq_key_entry.insert(0, groq_key.strip('"'))
     
     def save_config(self):
         """保存配置到 .env 文件"""
         try:
-            # 读取现有配置
-            env_content = {}
+            # 使用加载时缓存的配置
+            env_content = self._env_cache
             env_path = Path(".env")
             
-            if env_path.exists():
-                with open(env_path, 'r') as f:
-                    for line in f:
-                        if '=' in line and not line.strip().startswith('#'):
-                            key, value = line.split('=', 1)
-                            env_content[key.strip()] = value.strip()
-            
             # 更新 API Keys
             if self.api_key_entry.get().strip():
                 env_content['SILICONFLOW_API_KEY'] = f'"{self.api_key_entry.get().strip()}"'
@@ -132,9 +162,9 @@ class ControlUI:
                 env_content['SERVICE_PLATFORM'] = 'groq'
             
             # 写入文件
-            with open(env_path, 'w') as f:
-                for key, value in env_content.items():
-                    f.write(f"{key}={value}\n")
+            env_path.write_text(
+                "\n".join(f"{key}={value}" for key, value in env_content.items()) + "\n"
+            )
             
             messagebox.showinfo("成功", "配置已保存到 .env 文件")
             
@@ -153,10 +183,13 @@ class ControlUI:
             self.main_process = subprocess.Popen(
                 ["python", "main.py"],
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stderr=subprocess.STDOUT
             )
             
+            # 在后台线程中持续读取输出，避免管道写满导致子进程阻塞
+            threading.Thread(target=self._drain,
+                             args=(self.main_process.stdout,), daemon=True).start()
+            
             # 更新界面状态
             self.start_btn.config(state="disabled")
             self.stop_btn.config(state="normal")
@@ -183,6 +216,47 @@ class ControlUI:
             
             messagebox.showinfo("成功", "程序已停止")
     
+    def _drain(self, pipe):
+        """读取子进程输出并放入日志队列"""
+        for line in iter(pipe.readline, b''):
+            try:
+                self._log_q.put_nowait(line)
+            except queue.Full:
+                # 队列已满时丢弃最旧的一行，避免输出暴增时内存无限增长
+                try:
+                    self._log_q.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self._log_q.put_nowait(line)
+                except queue.Full:
+                    pass
+        pipe.close()
+    
+    def _pump_queue(self):
+        """每个周期批量取出日志并显示"""
+        lines = []
+        try:
+            while len(lines) < LOG_PUMP_BATCH:
+                lines.append(self._log_q.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if lines:
+            # 只对实际显示的行做解码，被丢弃的行不产生解码开销
+            self._append_log(b"".join(lines).decode('utf-8', errors='replace'))
+        self.root.after(LOG_PUMP_INTERVAL_MS, self._pump_queue)
+    
+    def _append_log(self, text):
+        """追加日志到日志区域"""
+        self.log_display.config(state="normal")
+        self.log_display.insert(tk.END, text)
+        # 只保留最近 MAX_LOG_LINES 行，避免长时间运行后内存和重绘开销不断增长；
+        # 文本末尾总有一个空行，因此多减一行
+        self.log_display.delete("1.0", f"end-{MAX_LOG_LINES + 1}l")
+        self.log_display.see(tk.END)
+        self.log_display.config(state="disabled")
+    
     def monitor_process(self):
         """监控主程序状态"""
         if self.main_process:
@@ -3,22 +3,22 @@
 讯飞API认证调试脚本
 """
 
-import os
 import time
 import base64
-import hashlib
 import hmac
 from urllib.parse import quote
 
-from dotenv import load_dotenv
+from src.utils.settings import get_settings
 
-load_dotenv()
+# 密钥只在导入时编码一次，签名时直接复用
+_SECRET = (get_settings().xunfei_api_secret or "").encode('utf-8')
 
 def generate_auth_url():
     """生成认证URL"""
-    app_id = os.getenv("XUNFEI_APP_ID")
-    api_key = os.getenv("XUNFEI_API_KEY")
-    api_secret = os.getenv("XUNFEI_API_SECRET")
+    settings = get_settings()
+    app_id = settings.xunfei_app_id
+    api_key = settings.xunfei_api_key
+    api_secret = settings.xunfei_api_secret
     host = "iat.xf-yun.com"
     path = "/v1"
 
@@ -38,18 +38,14 @@ def generate_auth_url():
     print(signature_origin)
     print()
 
-    signature_sha = hmac.new(
-        api_secret.encode('utf-8'),
-        signature_origin.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    signature = base64.b64encode(signature_sha).decode('utf-8')
+    signature_sha = hmac.digest(_SECRET, signature_origin.encode('utf-8'), 'sha256')
+    signature = base64.b64encode(signature_sha).decode('ascii')
 
     print(f"签名结果: {signature}")
     print()
 
     authorization_origin = f'api_key="{api_key}", algorithm="hmac-sha256", headers="host date request-line", signature="{signature}"'
-    authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
+    authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('ascii')
 
     print(f"Authorization原文:")
     print(repr(authorization_origin))
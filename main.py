@@ -7,11 +7,7 @@ load_dotenv()
 
 from src.audio.recorder import AudioRecorder
 from src.keyboard.listener import KeyboardManager, check_accessibility_permissions
-from src.transcription.whisper import WhisperProcessor
 from src.utils.logger import logger
-from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
-from src.transcription.hybrid import HybridProcessor
-from src.transcription.xunfei import XunfeiProcessor
 
 
 def check_microphone_permissions():
@@ -101,17 +97,22 @@ def main():
     enable_fallback = os.getenv("ENABLE_FALLBACK", "true").lower() == "true"
 
     try:
+        # 只导入实际使用的处理器模块
         if service_platform == "groq":
+            from src.transcription.whisper import WhisperProcessor
             audio_processor = WhisperProcessor()
             logger.info("使用 Groq Whisper 服务")
         elif service_platform == "siliconflow":
+            from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
             audio_processor = SenseVoiceSmallProcessor()
             logger.info("使用 SiliconFlow SenseVoice 服务")
         elif service_platform == "hybrid":
             # 混合模式：优先使用 SiliconFlow，失败时切换到 Groq
+            from src.transcription.hybrid import HybridProcessor
             audio_processor = HybridProcessor()
             logger.info("使用混合模式服务（优先 SiliconFlow，备用 Groq）")
         elif service_platform == "xunfei":
+            from src.transcription.xunfei import XunfeiProcessor
             audio_processor = XunfeiProcessor()
             logger.info("使用讯飞语音识别服务")
         else:
@@ -121,6 +122,7 @@ def main():
         if enable_fallback and service_platform == "siliconflow":
             logger.warning("SiliconFlow 初始化失败，尝试切换到 Groq...")
             try:
+                from src.transcription.whisper import WhisperProcessor
                 audio_processor = WhisperProcessor()
                 logger.info("已切换到 Groq Whisper 服务")
             except Exception as fallback_error:
@@ -0,0 +1,93 @@
+"""macOS 原生键盘监听
+通过 CGEventTap 只订阅按键相关事件，并在回调入口按键码过滤，
+只有配置的快捷键才会进入 KeyboardManager 的处理逻辑
+"""
+
+import sys
+
+from ..utils.logger import logger
+
+try:
+    import Quartz
+except ImportError:
+    Quartz = None
+
+
+# 修饰键按下/释放都通过 flagsChanged 事件上报，需要根据标志位区分
+_MODIFIER_FLAG_NAMES = {
+    54: "kCGEventFlagMaskCommand",     # 右 Command
+    55: "kCGEventFlagMaskCommand",     # 左 Command
+    56: "kCGEventFlagMaskShift",       # 左 Shift
+    60: "kCGEventFlagMaskShift",       # 右 Shift
+    58: "kCGEventFlagMaskAlternate",   # 左 Option
+    61: "kCGEventFlagMaskAlternate",   # 右 Option
+    59: "kCGEventFlagMaskControl",     # 左 Control
+    62: "kCGEventFlagMaskControl",     # 右 Control
+}
+
+
+def is_available():
+    """当前平台是否可以使用 CGEventTap"""
+    return sys.platform == "darwin" and Quartz is not None
+
+
+def run_event_tap(keys, on_press, on_release):
+    """阻塞运行 CGEventTap 监听，直到 run loop 停止
+
+    Args:
+        keys: 需要监听的 pynput Key 列表
+        on_press: 按键按下回调，参数为对应的 pynput Key
+        on_release: 按键释放回调，参数为对应的 pynput Key
+    """
+    keycodes = {key.value.vk: key for key in keys}
+    modifier_masks = {
+        keycode: getattr(Quartz, flag_name)
+        for keycode, flag_name in _MODIFIER_FLAG_NAMES.items()
+    }
+    tap_ref = [None]
+
+    def callback(proxy, event_type, event, refcon):
+        # 回调耗时过长或被用户输入打断时系统会停用监听，需要重新启用
+        if event_type in (Quartz.kCGEventTapDisabledByTimeout,
+                          Quartz.kCGEventTapDisabledByUserInput):
+            Quartz.CGEventTapEnable(tap_ref[0], True)
+            return event
+
+        keycode = Quartz.CGEventGetIntegerValueField(event, Quartz.kCGKeyboardEventKeycode)
+        key = keycodes.get(keycode)
+        if key is None:
+            return event
+
+        if event_type == Quartz.kCGEventKeyDown:
+            on_press(key)
+        elif event_type == Quartz.kCGEventKeyUp:
+            on_release(key)
+        elif event_type == Quartz.kCGEventFlagsChanged:
+            mask = modifier_masks.get(keycode)
+            if mask and Quartz.CGEventGetFlags(event) & mask:
+                on_press(key)
+            else:
+                on_release(key)
+        return event
+
+    event_mask = (Quartz.CGEventMaskBit(Quartz.kCGEventKeyDown) |
+                  Quartz.CGEventMaskBit(Quartz.kCGEventKeyUp) |
+                  Quartz.CGEventMaskBit(Quartz.kCGEventFlagsChanged))
+    tap = Quartz.CGEventTapCreate(
+        Quartz.kCGSessionEventTap,
+        Quartz.kCGHeadInsertEventTap,
+        Quartz.kCGEventTapOptionListenOnly,
+        event_mask,
+        callback,
+        None
+    )
+    if tap is None:
+        # 与 pynput 的报错信息保持一致，便于 main.py 提示授予辅助功能权限
+        raise RuntimeError("Input event monitoring will not be possible")
+    tap_ref[0] = tap
+
+    source = Quartz.CFMachPortCreateRunLoopSource(None, tap, 0)
+    Quartz.CFRunLoopAddSource(Quartz.CFRunLoopGetCurrent(), source, Quartz.kCFRunLoopCommonModes)
+    Quartz.CGEventTapEnable(tap, True)
+    logger.info("使用 CGEventTap 监听键盘事件")
+    Quartz.CFRunLoopRun()
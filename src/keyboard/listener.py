@@ -1,25 +1,50 @@
 from pynput.keyboard import Controller, Key, Listener
 import pyperclip
 from ..utils.logger import logger
+from ..utils.settings import get_settings
 import time
+import threading
 from .inputState import InputState
+from . import eventTap
 import os
 
 
+def _native_clipboard_paste():
+    """macOS 下直接读取 NSPasteboard，避免每次调用都启动 pbpaste 子进程"""
+    try:
+        from AppKit import NSPasteboard, NSPasteboardTypeString
+    except ImportError:
+        return None
+
+    pasteboard = NSPasteboard.generalPasteboard()
+
+    def paste():
+        return pasteboard.stringForType_(NSPasteboardTypeString) or ""
+
+    return paste
+
+
 class KeyboardManager:
     def __init__(self, on_record_start, on_record_stop, on_translate_start, on_translate_stop, on_reset_state):
         self.keyboard = Controller()
         self.option_pressed = False
         self.shift_pressed = False
         self.temp_text_length = 0  # 用于跟踪临时文本的长度
+        self._last_temp_text = None  # 最近一次输入的临时文本
         self.processing_text = None  # 用于跟踪正在处理的文本
         self.error_message = None  # 用于跟踪错误信息
         self.warning_message = None  # 用于跟踪警告信息
         self.option_press_time = None  # 记录 Option 按下的时间戳
         self.PRESS_DURATION_THRESHOLD = 0.5  # 按键持续时间阈值（秒）
-        self.is_checking_duration = False  # 用于控制定时器线程
+        self._trigger_timer = None  # 按键时长触发定时器
+        self._clear_timer = None  # 消息清除定时器
         self.has_triggered = False  # 用于防止重复触发
         self._original_clipboard = None  # 保存原始剪贴板内容
+        self.keep_original_clipboard = get_settings().keep_original_clipboard
+        # 终端和部分编辑器中 Shift+Left 不会选中文本，默认逐字符退格删除
+        self.select_delete = get_settings().select_delete
+        # 启动时确定剪贴板读取方式，按键时不再重复探测
+        self._clipboard_paste = _native_clipboard_paste() or pyperclip.determine_clipboard()[1]
         
         
         # 回调函数
@@ -41,6 +66,16 @@ class KeyboardManager:
             InputState.ERROR: lambda msg: f"{msg}",  # 错误消息使用函数动态生成
             InputState.WARNING: lambda msg: f"⚠️ {msg}"  # 警告消息使用函数动态生成
         }
+        # 状态转换处理函数，只在初始化时构建一次
+        self._state_handlers = {
+            InputState.IDLE: self._enter_idle,
+            InputState.RECORDING: self._enter_recording,
+            InputState.RECORDING_TRANSLATE: self._enter_recording_translate,
+            InputState.PROCESSING: self._enter_processing,
+            InputState.TRANSLATING: self._enter_translating,
+            InputState.WARNING: self._enter_warning,
+            InputState.ERROR: self._enter_error,
+        }
 
         # 获取系统平台
         system_platform = os.getenv("SYSTEM_PLATFORM")
@@ -67,6 +102,10 @@ class KeyboardManager:
         except KeyError:
             logger.error(f"无效的翻译按钮配置：{translations_button}")
 
+        # 缓存触发按键，事件回调中直接做身份比较（Key 枚举成员是单例）
+        self._record_key = getattr(self, "transcriptions_button", None)
+        self._translate_key = getattr(self, "translations_button", None)
+
         logger.info(f"按住 {transcriptions_button} 键：实时语音转录（保持原文）")
         logger.info(f"按住 {translations_button} + {transcriptions_button} 键：实时语音翻译（翻译成英文）")
     
@@ -80,74 +119,78 @@ class KeyboardManager:
         """设置新状态并更新UI"""
         if new_state != self._state:
             self._state = new_state
-            
-            # 获取状态消息
-            message = self._state_messages[new_state]
-            
             # 根据状态转换类型显示不同消息
-            match new_state:
-                case InputState.RECORDING :
-                    # 录音状态
-                    self.temp_text_length = 0
-                    self.type_temp_text(message)
-                    self.on_record_start()
-                    
-                
-                case InputState.RECORDING_TRANSLATE:
-                    # 翻译,录音状态
-                    self.temp_text_length = 0
-                    self.type_temp_text(message)
-                    self.on_translate_start()
-
-                case InputState.PROCESSING:
-                    # 删除录音状态文本（"🎤 正在录音..."）
-                    self._delete_previous_text()
-                    # 输入处理状态文本（"🔄 正在转录..."）
-                    self.type_temp_text(message)
-                    self.processing_text = message
-                    self.on_record_stop()
-
-                case InputState.TRANSLATING:
-                    # 翻译状态
-                    # 删除录音状态文本（"🎤 正在录音 (翻译模式)"）
-                    self._delete_previous_text()
-                    # 输入翻译状态文本（"🔄 正在翻译..."）
-                    self.type_temp_text(message)
-                    self.processing_text = message
-                    self.on_translate_stop()
-                
-                case InputState.WARNING:
-                    # 警告状态
-                    message = message(self.warning_message)
-                    self._delete_previous_text()
-                    self.type_temp_text(message)
-                    self.warning_message = None
-                    self._schedule_message_clear()     
-                
-                case InputState.ERROR:
-                    # 错误状态
-                    message = message(self.error_message)
-                    self._delete_previous_text()
-                    self.type_temp_text(message)
-                    self.error_message = None
-                    self._schedule_message_clear()  
-            
-                case InputState.IDLE:
-                    # 空闲状态，清除所有临时文本
-                    self.processing_text = None
-                
-                case _:
-                    # 其他状态
-                    self.type_temp_text(message)
+            handler = self._state_handlers.get(new_state, self._enter_default)
+            handler(self._state_messages[new_state])
+
+    def _enter_recording(self, message):
+        """录音状态"""
+        self.temp_text_length = 0
+        self.type_temp_text(message)
+        self.on_record_start()
+
+    def _enter_recording_translate(self, message):
+        """翻译,录音状态"""
+        self.temp_text_length = 0
+        self.type_temp_text(message)
+        self.on_translate_start()
+
+    def _enter_processing(self, message):
+        """处理状态"""
+        # 删除录音状态文本（"🎤 正在录音..."）
+        self._delete_previous_text()
+        # 输入处理状态文本（"🔄 正在转录..."）
+        self.type_temp_text(message)
+        self.processing_text = message
+        self.on_record_stop()
+
+    def _enter_translating(self, message):
+        """翻译状态"""
+        # 删除录音状态文本（"🎤 正在录音 (翻译模式)"）
+        self._delete_previous_text()
+        # 输入翻译状态文本（"🔄 正在翻译..."）
+        self.type_temp_text(message)
+        self.processing_text = message
+        self.on_translate_stop()
+
+    def _enter_warning(self, message):
+        """警告状态"""
+        message = message(self.warning_message)
+        self._delete_previous_text()
+        self.type_temp_text(message)
+        self.warning_message = None
+        self._schedule_message_clear()
+
+    def _enter_error(self, message):
+        """错误状态"""
+        message = message(self.error_message)
+        self._delete_previous_text()
+        self.type_temp_text(message)
+        self.error_message = None
+        self._schedule_message_clear()
+
+    def _enter_idle(self, message):
+        """空闲状态，清除所有临时文本"""
+        self.processing_text = None
+
+    def _enter_default(self, message):
+        """其他状态"""
+        self.type_temp_text(message)
     
     def _schedule_message_clear(self):
-        """计划清除消息"""
-        def clear_message():
-            time.sleep(2)  # 警告消息显示2秒
-            self.state = InputState.IDLE
-        
-        import threading
-        threading.Thread(target=clear_message, daemon=True).start()
+        """计划清除消息，新消息会重置尚未触发的定时器"""
+        if self._clear_timer is not None:
+            self._clear_timer.cancel()
+
+        # 警告消息显示2秒
+        self._clear_timer = threading.Timer(2.0, self._clear_message)
+        self._clear_timer.daemon = True
+        self._clear_timer.start()
+
+    def _clear_message(self):
+        """清除警告或错误消息"""
+        self._clear_timer = None
+        self.state = InputState.IDLE
     
     def show_warning(self, warning_message):
         """显示警告消息"""
@@ -162,7 +205,7 @@ class KeyboardManager:
     def _save_clipboard(self):
         """保存当前剪贴板内容"""
         if self._original_clipboard is None:
-            self._original_clipboard = pyperclip.paste()
+            self._original_clipboard = self._clipboard_paste()
 
     def _restore_clipboard(self):
         """恢复原始剪贴板内容"""
@@ -200,11 +243,7 @@ class KeyboardManager:
                 processing_length = len(self.processing_text)
                 logger.info(f"删除状态文本: '{self.processing_text}' (长度: {processing_length})")
 
-                # 使用更可靠的方法删除文本
-                for _ in range(processing_length):
-                    self.keyboard.press(Key.backspace)
-                    self.keyboard.release(Key.backspace)
-                    time.sleep(0.01)  # 短暂延迟确保每次删除都生效
+                self._bulk_delete(processing_length)
 
                 self.processing_text = None
                 self.temp_text_length = 0
@@ -213,10 +252,7 @@ class KeyboardManager:
             # 额外检查：如果还有残留的 temp_text_length，也删除
             if self.temp_text_length > 0:
                 logger.info(f"删除剩余临时文本 (长度: {self.temp_text_length})")
-                for _ in range(self.temp_text_length):
-                    self.keyboard.press(Key.backspace)
-                    self.keyboard.release(Key.backspace)
-                    time.sleep(0.01)
+                self._bulk_delete(self.temp_text_length)
                 self.temp_text_length = 0
 
             logger.info(f"输入文本：{text}")
@@ -231,7 +267,7 @@ class KeyboardManager:
             self._delete_previous_text()
 
             # 将转录结果复制到剪贴板
-            if os.getenv("KEEP_ORIGINAL_CLIPBOARD", "true").lower() != "true":
+            if not self.keep_original_clipboard:
                 pyperclip.copy(text)
             else:
                 # 恢复原始剪贴板内容
@@ -245,19 +281,48 @@ class KeyboardManager:
             logger.error(f"文本输入失败: {e}")
             self.show_error(f"❌ 文本输入失败: {e}")
     
-    def _delete_previous_text(self):
-        """删除之前输入的临时文本"""
-        if self.temp_text_length > 0:
-            for _ in range(self.temp_text_length):
+    def _bulk_delete(self, length, key_delay=0.01):
+        """删除光标前的 length 个字符
+
+        key_delay 为逐字符退格时每次按键后的等待时间（秒）
+        """
+        if length <= 0:
+            return
+
+        if not self.select_delete:
+            # 逐字符退格，在终端等不支持 Shift 选择的环境中同样有效
+            for _ in range(length):
                 self.keyboard.press(Key.backspace)
                 self.keyboard.release(Key.backspace)
+                if key_delay:
+                    time.sleep(key_delay)  # 短暂延迟确保每次删除都生效
+            return
 
+        # 按住 Shift 连续左移选中文本，中间不做逐字符等待
+        with self.keyboard.pressed(Key.shift):
+            for _ in range(length):
+                self.keyboard.press(Key.left)
+                self.keyboard.release(Key.left)
+        self.keyboard.press(Key.backspace)
+        self.keyboard.release(Key.backspace)
+
+        # 整批按键结束后统一等待一次，避免目标应用丢失事件
+        time.sleep(0.02)
+
+    def _delete_previous_text(self):
+        """删除之前输入的临时文本"""
+        # 删除状态文本时逐字符退格不等待，与原先的行为一致
+        self._bulk_delete(self.temp_text_length, key_delay=0)
         self.temp_text_length = 0
     
     def type_temp_text(self, text):
         """输入临时状态文本"""
         if not text:
             return
+
+        # 相同的临时文本仍在屏幕上时，无需再走一遍剪贴板
+        if self.temp_text_length == len(text) and text == self._last_temp_text:
+            return
             
         # 将文本复制到剪贴板
         pyperclip.copy(text)
@@ -269,47 +334,46 @@ class KeyboardManager:
 
         # 更新临时文本长度
         self.temp_text_length = len(text)
+        self._last_temp_text = text
     
-    def start_duration_check(self):
-        """开始检查按键持续时间"""
-        if self.is_checking_duration:
+    def _start_trigger_timer(self):
+        """按键按下后启动定时器，达到阈值时触发录音"""
+        if self._trigger_timer is not None:
             return
 
-        def check_duration():
-            while self.is_checking_duration and self.option_pressed:
-                current_time = time.time()
-                if (not self.has_triggered and 
-                    self.option_press_time and 
-                    (current_time - self.option_press_time) >= self.PRESS_DURATION_THRESHOLD):
-                    
-                    # 达到阈值时触发相应功能
-                    if self.option_pressed and self.shift_pressed and self.state.can_start_recording:
-                        self.state = InputState.RECORDING_TRANSLATE
-                        # self.on_translate_start()
-                        self.has_triggered = True
-                    elif self.option_pressed and not self.shift_pressed and self.state.can_start_recording:
-                        self.state = InputState.RECORDING
-                        # self.on_record_start()
-                        self.has_triggered = True
-                
-                time.sleep(0.01)  # 短暂休眠以降低 CPU 使用率
+        self._trigger_timer = threading.Timer(self.PRESS_DURATION_THRESHOLD, self._fire_trigger)
+        self._trigger_timer.daemon = True
+        self._trigger_timer.start()
+
+    def _cancel_trigger_timer(self):
+        """取消尚未触发的定时器"""
+        if self._trigger_timer is not None:
+            self._trigger_timer.cancel()
+            self._trigger_timer = None
 
-        self.is_checking_duration = True
-        import threading
-        threading.Thread(target=check_duration, daemon=True).start()
+    def _fire_trigger(self):
+        """按键持续时间达到阈值时触发相应功能"""
+        self._trigger_timer = None
+        if not self.option_pressed or self.has_triggered or not self.state.can_start_recording:
+            return
+
+        if self.shift_pressed:
+            self.state = InputState.RECORDING_TRANSLATE
+        else:
+            self.state = InputState.RECORDING
+        self.has_triggered = True
 
     def on_press(self, key):
         """按键按下时的回调"""
         try:
-            if key == self.transcriptions_button: #Key.f8:  # Option 键按下
+            if key is self._record_key: #Key.f8:  # Option 键按下
                 # 在开始任何操作前保存剪贴板内容
-                if self._original_clipboard is None:
-                    self._original_clipboard = pyperclip.paste()
+                self._save_clipboard()
                     
                 self.option_pressed = True
                 self.option_press_time = time.time()
-                self.start_duration_check()
-            elif key == self.translations_button:
+                self._start_trigger_timer()
+            elif key is self._translate_key:
                 self.shift_pressed = True
         except AttributeError:
             pass
@@ -317,11 +381,11 @@ class KeyboardManager:
     def on_release(self, key):
         """按键释放时的回调"""
         try:
-            if key == self.transcriptions_button:# Key.f8:  # Option 键释放
+            if key is self._record_key:# Key.f8:  # Option 键释放
                 self.shift_pressed = False
                 self.option_pressed = False
                 self.option_press_time = None
-                self.is_checking_duration = False
+                self._cancel_trigger_timer()
                 
                 if self.has_triggered:
                     if self.state == InputState.RECORDING_TRANSLATE:
@@ -329,7 +393,7 @@ class KeyboardManager:
                     elif self.state == InputState.RECORDING:
                         self.state = InputState.PROCESSING
                     self.has_triggered = False
-            elif key == self.translations_button:#Key.f7:
+            elif key is self._translate_key:#Key.f7:
                 self.shift_pressed = False
                 if (self.state == InputState.RECORDING_TRANSLATE and 
                     not self.option_pressed and 
@@ -341,6 +405,12 @@ class KeyboardManager:
     
     def start_listening(self):
         """开始监听键盘事件"""
+        # macOS 上优先使用原生 CGEventTap，不可用时退回 pynput
+        if eventTap.is_available():
+            keys = [key for key in (self._record_key, self._translate_key) if key is not None]
+            eventTap.run_event_tap(keys, self.on_press, self.on_release)
+            return
+
         with Listener(on_press=self.on_press, on_release=self.on_release) as listener:
             listener.join()
 
@@ -356,7 +426,7 @@ class KeyboardManager:
         self.option_pressed = False
         self.shift_pressed = False
         self.option_press_time = None
-        self.is_checking_duration = False
+        self._cancel_trigger_timer()
         self.has_triggered = False
         self.processing_text = None
         self.error_message = None
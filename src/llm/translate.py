@@ -1,4 +1,8 @@
 import os
+import threading
+from functools import lru_cache
+
+import orjson
 import requests
 from dotenv import load_dotenv
 
@@ -12,6 +16,17 @@ class TranslateProcessor:
             "Content-Type": "application/json"
         }
         self.model = os.getenv("SILICONFLOW_TRANSLATE_MODEL", "THUDM/glm-4-9b-chat")
+        # 复用 keep-alive 连接，多次翻译无需重复握手；
+        # 翻译会在键盘监听线程和线程池中并发调用，requests.Session 不保证线程安全，每个线程各用一个
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """当前线程的 requests.Session，首次使用时创建"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
 
     def translate(self, text):
         system_prompt = """
@@ -33,7 +48,13 @@ class TranslateProcessor:
             ]
         }
         try:
-            response = requests.request("POST", self.url, headers=self.headers, json=payload)
-            return response.json().get('choices', [{}])[0].get('message', {}).get('content', '')
+            response = self.session.request("POST", self.url, headers=self.headers, data=orjson.dumps(payload))
+            return orjson.loads(response.content).get('choices', [{}])[0].get('message', {}).get('content', '')
         except Exception as e:
-            return text, e
\ No newline at end of file
+            return text, e
+
+
+@lru_cache(maxsize=1)
+def get_translate_processor():
+    """获取共享的翻译处理器，首次调用时创建"""
+    return TranslateProcessor()
@@ -2,111 +2,320 @@
 混合处理器：优先使用 SiliconFlow，失败时自动切换到 Groq
 """
 
-import os
+import asyncio
+import functools
+import hashlib
+import io
 import threading
 import time
-from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Optional
 
-import dotenv
-
-from src.transcription.whisper import WhisperProcessor
-from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
-from src.transcription.xunfei import XunfeiProcessor
+from ..llm.translate import get_translate_processor
+from ..utils.eventLoop import run_sync
 from ..utils.logger import logger
+from ..utils.settings import get_settings
+
+
+# 各处理器在创建时才导入对应模块，未启用的后端不产生导入开销
+def _create_siliconflow(translate_processor):
+    from src.transcription.senseVoiceSmall import SenseVoiceSmallProcessor
+    return SenseVoiceSmallProcessor(translate_processor=translate_processor)
+
+
+def _create_xunfei(translate_processor):
+    from src.transcription.xunfei import XunfeiProcessor
+    return XunfeiProcessor(translate_processor=translate_processor)
+
+
+def _create_groq(translate_processor):
+    # Groq 使用 Whisper 自带的翻译接口，不需要翻译处理器；
+    # 失败后由混合处理器切换到其他服务，不需要 SDK 再自动重试
+    from src.transcription.whisper import WhisperProcessor
+    return WhisperProcessor(max_retries=0)
+
+
+class _ResultCache:
+    """带过期时间的 LRU 缓存，用于复用相同音频的识别结果"""
+
+    def __init__(self, maxsize=128, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (过期时间, 结果)
+        self._lock = threading.Lock()
 
-dotenv.load_dotenv()
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class CircuitState(Enum):
+    """处理器熔断状态"""
+    CLOSED = auto()     # 正常，允许请求
+    OPEN = auto()       # 熔断中，冷却结束前跳过
+    HALF_OPEN = auto()  # 冷却结束，只放行一次探测请求
+
+
+@dataclass
+class ProviderState:
+    """单个处理器的故障转移状态
+
+    只在后台事件循环线程中读写，不需要加锁
+    """
+    fallback_count: int = 0
+    circuit: CircuitState = CircuitState.CLOSED
+    reopen_at: float = 0.0  # 熔断打开后允许重新尝试的时间点（time.monotonic）
+    preflight_at: Optional[float] = None  # 最近一次连通性预检的时间点
+    reachable: bool = True  # 最近一次连通性预检是否可达
+    auth_locked: bool = False  # 熔断是否由认证失败引起，冷却结束前不提前探测
 
 
 class HybridProcessor:
     """混合语音处理器：支持故障转移"""
 
+    HEDGE_DELAY = 1.5  # 处理器超过该时长未返回时，并行启动下一个处理器（秒）
+    AUTH_ERROR_CODES = (401, 403)  # 认证失败，短时间内重试也不会恢复
+    AUTH_LOCKOUT = 3600  # 认证失败后的冷却时间（秒）
+    PREFLIGHT_TIMEOUT = 1.0  # 连通性预检的连接超时（秒）
+    PREFLIGHT_TTL = 30  # 连通性预检结果的有效期（秒）
+    PREFLIGHT_HOSTS = {
+        "siliconflow": "api.siliconflow.cn",
+        "xunfei": "iat-api.xfyun.cn",
+        "groq": "api.groq.com",
+    }
+
     def __init__(self):
+        self._settings = get_settings()
         self.processors = {}  # 所有可用处理器
         self.priority_order = ["siliconflow", "xunfei", "groq"]  # 优先级顺序
-        self.enable_fallback = os.getenv("ENABLE_FALLBACK", "true").lower() == "true"
-        self.fallback_count = {}
+        self.enable_fallback = self._settings.enable_fallback
+        self.state = {}  # 各处理器的故障转移状态
         self.max_fallbacks = 3  # 最大故障转移次数
-        self.last_fallback_time = {}
-        self.fallback_cooldown = 300  # 5分钟冷却时间
+        self.fallback_cooldown = self._settings.fallback_cooldown  # 默认5分钟冷却时间
+        self._result_cache = _ResultCache(maxsize=128, ttl=600)  # 相同音频的识别结果缓存
+        self._preflight_task = None  # 后台运行中的连通性预检任务
 
         # 初始化处理器
         self._initialize_processors()
 
     def _initialize_processors(self):
         """初始化语音处理器"""
-        # 初始化 SiliconFlow
-        try:
-            self.processors["siliconflow"] = SenseVoiceSmallProcessor()
-            self.fallback_count["siliconflow"] = 0
-            self.last_fallback_time["siliconflow"] = 0
-            logger.info("✅ SiliconFlow 处理器初始化成功")
-        except Exception as e:
-            logger.warning(f"⚠️ SiliconFlow 处理器初始化失败: {e}")
+        processor_factories = {
+            "siliconflow": ("SiliconFlow", self._settings.enable_siliconflow, _create_siliconflow),
+            "xunfei": ("讯飞", self._settings.enable_xunfei, _create_xunfei),
+            "groq": ("Groq", self._settings.enable_groq, _create_groq),
+        }
 
-        # 初始化讯飞
-        try:
-            self.processors["xunfei"] = XunfeiProcessor()
-            self.fallback_count["xunfei"] = 0
-            self.last_fallback_time["xunfei"] = 0
-            logger.info("✅ 讯飞处理器初始化成功")
-        except Exception as e:
-            logger.warning(f"⚠️ 讯飞处理器初始化失败: {e}")
+        # 所有处理器共用一个翻译处理器
+        translate_processor = get_translate_processor()
 
-        # 初始化 Groq
-        try:
-            self.processors["groq"] = WhisperProcessor()
-            self.fallback_count["groq"] = 0
-            self.last_fallback_time["groq"] = 0
-            logger.info("✅ Groq 处理器初始化成功")
-        except Exception as e:
-            logger.warning(f"⚠️ Groq 处理器初始化失败: {e}")
+        # 各处理器的初始化互不依赖，并行执行使启动耗时取决于最慢的一个
+        futures = {}
+        with ThreadPoolExecutor(max_workers=len(processor_factories)) as executor:
+            for processor_name in self.priority_order:
+                display_name, enabled, factory = processor_factories[processor_name]
+                if not enabled:
+                    logger.info(f"⏭️ {display_name} 处理器已禁用，跳过初始化")
+                    continue
+                futures[processor_name] = executor.submit(factory, translate_processor)
+
+        for processor_name, future in futures.items():
+            display_name = processor_factories[processor_name][0]
+            try:
+                self.processors[processor_name] = future.result()
+                self.state[processor_name] = ProviderState()
+                logger.info(f"✅ {display_name} 处理器初始化成功")
+            except Exception as e:
+                logger.warning(f"⚠️ {display_name} 处理器初始化失败: {e}")
 
         # 检查是否至少有一个处理器可用
         if not self.processors:
             raise RuntimeError("❌ 所有语音处理器都初始化失败")
 
-    def _should_try_processor(self, processor_name):
+    def _preflight_target(self, processor_name):
+        """获取处理器的预检地址，自定义了 base_url 的客户端以其为准"""
+        base_url = getattr(getattr(self.processors[processor_name], "client", None), "base_url", None)
+        if base_url is not None and base_url.host:
+            return base_url.host, base_url.port or 443
+        host = self.PREFLIGHT_HOSTS.get(processor_name)
+        return (host, 443) if host else None
+
+    async def _preflight(self, host, port=443, timeout=PREFLIGHT_TIMEOUT):
+        """检查能否在 timeout 内与服务端建立 TCP 连接"""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def _refresh_preflight(self, processor_names):
+        """并行预检结果已过期的处理器"""
+        now = time.monotonic()
+        targets = {}
+        for processor_name in processor_names:
+            checked_at = self.state[processor_name].preflight_at
+            if checked_at is not None and now - checked_at < self.PREFLIGHT_TTL:
+                continue
+            target = self._preflight_target(processor_name)
+            if target:
+                targets[processor_name] = target
+
+        if not targets:
+            return
+        results = await asyncio.gather(*(self._preflight(*target) for target in targets.values()))
+        for processor_name, reachable in zip(targets, results):
+            state = self.state[processor_name]
+            state.preflight_at = now
+            state.reachable = reachable
+            if not reachable:
+                logger.warning(f"⚠️ {processor_name} 连通性预检失败，{self.PREFLIGHT_TTL}秒内跳过")
+
+    def _is_reachable(self, processor_name):
+        """最近一次预检是否可达，没有预检结果时视为可达"""
+        state = self.state[processor_name]
+        return state.reachable or time.monotonic() - state.preflight_at >= self.PREFLIGHT_TTL
+
+    def _should_try_processor(self, processor_name, check_reachable=True):
         """判断是否应该尝试某个处理器"""
         processor = self.processors.get(processor_name)
         if not processor:
             return False
 
-        # 如果在冷却期内，不尝试该处理器
-        current_time = time.time()
-        if (self.fallback_count.get(processor_name, 0) > 0 and
-            current_time - self.last_fallback_time.get(processor_name, 0) < self.fallback_cooldown):
-            logger.info(f"🔄 {processor_name} 处理器在冷却期内，跳过")
+        if check_reachable and not self._is_reachable(processor_name):
+            logger.info(f"🔄 {processor_name} 处理器预检不可达，跳过")
+            return False
+
+        state = self.state[processor_name]
+        if state.circuit is CircuitState.OPEN:
+            # 如果在冷却期内，不尝试该处理器
+            if time.monotonic() < state.reopen_at:
+                logger.info(f"🔄 {processor_name} 处理器在冷却期内，跳过")
+                return False
+            # 冷却结束，进入半开状态，只放行一次探测请求
+            logger.info(f"🔍 {processor_name} 冷却结束，发送探测请求")
+            state.circuit = CircuitState.HALF_OPEN
+            return True
+
+        if state.circuit is CircuitState.HALF_OPEN:
+            # 探测请求尚未返回前不再放行其他请求
+            logger.info(f"🔄 {processor_name} 处理器正在探测恢复，跳过")
             return False
 
         return True
 
-    def _process_with_processor(self, processor_name, audio_buffer, mode, prompt):
-        """使用指定处理器处理音频"""
-        if not self._should_try_processor(processor_name):
-            return None, f"{processor_name} 处理器在冷却期"
+    def _record_success(self, processor_name):
+        """处理成功，关闭熔断"""
+        state = self.state[processor_name]
+        if state.circuit is not CircuitState.CLOSED:
+            logger.info(f"✅ {processor_name} 恢复正常，重置故障转移状态")
+        state.circuit = CircuitState.CLOSED
+        state.fallback_count = 0
+        state.auth_locked = False
+
+    def _record_failure(self, processor_name, cooldown=None):
+        """处理失败，连续失败达到 max_fallbacks 次后打开熔断直到冷却结束
+
+        指定 cooldown 或探测请求失败时立即打开熔断
+        """
+        state = self.state[processor_name]
+        state.fallback_count += 1
+        logger.info(f"📊 {processor_name} 故障转移计数: {state.fallback_count}/{self.max_fallbacks}")
+        if (cooldown is None and state.circuit is CircuitState.CLOSED
+                and state.fallback_count < self.max_fallbacks):
+            return
+        state.circuit = CircuitState.OPEN
+        state.reopen_at = time.monotonic() + (cooldown or self.fallback_cooldown)
+
+    def _earliest_open(self, processor_names):
+        """所有处理器都不可用时，返回熔断中最早结束冷却的处理器并放行一次探测请求
+
+        因认证失败而熔断的处理器在冷却结束前不会被选中
+        """
+        now = time.monotonic()
+        open_names = [
+            name for name in processor_names
+            if self.state[name].circuit is CircuitState.OPEN
+            and not (self.state[name].auth_locked and now < self.state[name].reopen_at)
+        ]
+        if not open_names:
+            return None
+        processor_name = min(open_names, key=lambda name: self.state[name].reopen_at)
+        logger.info(f"🔍 所有处理器都在冷却期，提前探测 {processor_name}")
+        self.state[processor_name].circuit = CircuitState.HALF_OPEN
+        return processor_name
+
+    def _release_probe(self, processor_name, task):
+        """探测任务被取消时恢复为熔断状态，下次请求可重新探测
+
+        作为任务的完成回调执行，任务在开始运行前就被取消时同样生效
+        """
+        state = self.state[processor_name]
+        if task.cancelled() and state.circuit is CircuitState.HALF_OPEN:
+            state.circuit = CircuitState.OPEN
+
+    def _handle_failure(self, processor_name, error):
+        """记录处理失败；未启用故障转移时直接抛出异常"""
+        logger.warning(f"⚠️ {processor_name} 处理失败: {error}")
+        if not self.enable_fallback:
+            raise error
+        # 更新故障转移状态，认证失败时长时间跳过该处理器
+        status_code = getattr(self.processors[processor_name], "last_status_code", None)
+        if status_code in self.AUTH_ERROR_CODES:
+            logger.error(f"❌ {processor_name} 认证失败 (HTTP {status_code})，{self.AUTH_LOCKOUT}秒内不再尝试")
+            self._record_failure(processor_name, cooldown=self.AUTH_LOCKOUT)
+            self.state[processor_name].auth_locked = True
+        else:
+            self._record_failure(processor_name)
+            self.state[processor_name].auth_locked = False
+        return None, str(error)
+
+    async def _process_with_processor_async(self, processor_name, audio_buffer, mode, prompt):
+        """异步使用指定处理器处理音频（调用前需通过 _should_try_processor 检查）
+
+        处理器提供 process_audio_async 时直接在事件循环中等待，
+        否则在线程池中运行同步的 process_audio。
+        状态更新始终在事件循环线程中进行
+        """
+        processor = self.processors[processor_name]
+        process_audio_async = getattr(processor, "process_audio_async", None)
 
         try:
-            processor = self.processors[processor_name]
             logger.info(f"🎯 尝试使用 {processor_name} 处理器")
-            result = processor.process_audio(audio_buffer, mode, prompt)
-
-            # 如果成功，重置故障转移计数
-            if self.fallback_count.get(processor_name, 0) > 0:
-                logger.info(f"✅ {processor_name} 恢复正常，重置故障转移状态")
-                self.fallback_count[processor_name] = 0
+            if process_audio_async is not None:
+                result, error = await process_audio_async(audio_buffer, mode, prompt)
+            else:
+                result, error = await asyncio.to_thread(processor.process_audio, audio_buffer, mode, prompt)
+            if error:
+                raise RuntimeError(error)
 
-            return result
+            self._record_success(processor_name)
+            return result, None
 
         except Exception as e:
-            logger.warning(f"⚠️ {processor_name} 处理失败: {e}")
-            if self.enable_fallback:
-                # 更新故障转移状态
-                self.fallback_count[processor_name] = self.fallback_count.get(processor_name, 0) + 1
-                self.last_fallback_time[processor_name] = time.time()
-                logger.info(f"📊 {processor_name} 故障转移计数: {self.fallback_count[processor_name]}/{self.max_fallbacks}")
-                return None, str(e)
-            else:
-                raise e
+            return self._handle_failure(processor_name, e)
 
     def process_audio(self, audio_buffer, mode="transcriptions", prompt=""):
         """处理音频，支持故障转移
@@ -119,17 +328,98 @@ class HybridProcessor:
         Returns:
             tuple: (结果文本, 错误信息)
         """
-        start_time = time.time()
-
-        # 按优先级顺序尝试各个处理器
-        for processor_name in self.priority_order:
-            if processor_name in self.processors:
-                result, error = self._process_with_processor(processor_name, audio_buffer, mode, prompt)
-                if result:
-                    logger.info(f"✅ {processor_name} 处理器成功，耗时: {time.time() - start_time:.1f}秒")
-                    return result, None
-                elif not self.enable_fallback:
-                    return None, error
+        return run_sync(self.process_audio_async(audio_buffer, mode, prompt))
+
+    async def process_audio_async(self, audio_buffer, mode="transcriptions", prompt=""):
+        """异步处理音频，支持故障转移
+
+        当前处理器超过 HEDGE_DELAY 仍未返回时，并行启动下一个处理器，
+        采用最先成功返回的结果并取消其余处理器。
+
+        Args:
+            audio_buffer: 音频数据缓冲
+            mode: 'transcriptions' 或 'translations'
+            prompt: 提示词
+
+        Returns:
+            tuple: (结果文本, 错误信息)
+        """
+        start_time = time.monotonic()
+
+        # 各处理器会关闭传入的缓冲区，因此每次尝试使用独立的副本
+        audio_data = audio_buffer.getvalue()
+        audio_buffer.close()
+
+        # 相同音频（重试、重复触发等）直接返回缓存结果
+        cache_key = (mode, prompt, hashlib.blake2b(audio_data, digest_size=16).digest())
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("♻️ 命中识别结果缓存")
+            return cached, None
+
+        candidate_names = [name for name in self.priority_order if name in self.processors]
+        if self.enable_fallback and (self._preflight_task is None or self._preflight_task.done()):
+            # 预检在后台进行，不阻塞本次请求；本次按已有的预检结果选择处理器
+            self._preflight_task = asyncio.create_task(self._refresh_preflight(candidate_names))
+        # 全部预检失败时多半是网络需要代理，仍按原顺序尝试
+        check_reachable = self.enable_fallback and any(map(self._is_reachable, candidate_names))
+
+        candidates = iter(candidate_names)
+        pending = {}
+
+        def launch(processor_name):
+            task = asyncio.create_task(self._process_with_processor_async(
+                processor_name, io.BytesIO(audio_data), mode, prompt))
+            # 被其他处理器抢先返回而取消时不计入故障，但要释放探测名额
+            task.add_done_callback(functools.partial(self._release_probe, processor_name))
+            pending[task] = processor_name
+
+        def launch_next():
+            """启动下一个候选处理器，没有可用处理器时返回 False"""
+            for processor_name in candidates:
+                if not self._should_try_processor(processor_name, check_reachable):
+                    continue
+                launch(processor_name)
+                return True
+            return False
+
+        try:
+            has_more = launch_next()
+            if not pending and self.enable_fallback:
+                # 全部处理器都在冷却期时不直接失败，仍尝试最早结束冷却的一个
+                processor_name = self._earliest_open(candidate_names)
+                if processor_name:
+                    launch(processor_name)
+                else:
+                    locked = [name for name in candidate_names if self.state[name].auth_locked]
+                    if locked:
+                        return None, f"❌ {', '.join(locked)} 认证失败，{self.AUTH_LOCKOUT}秒内不再尝试"
+            while pending:
+                # 未启用故障转移时只等待首个处理器，不做对冲
+                timeout = self.HEDGE_DELAY if has_more and self.enable_fallback else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    logger.info(f"⏱️ {', '.join(pending.values())} 超过 {self.HEDGE_DELAY}秒未返回，启动下一个处理器")
+                    has_more = launch_next()
+                    continue
+
+                for task in done:
+                    processor_name = pending.pop(task)
+                    result, error = task.result()
+                    if result:
+                        logger.info(f"✅ {processor_name} 处理器成功，耗时: {time.monotonic() - start_time:.1f}秒")
+                        self._result_cache.set(cache_key, result)
+                        return result, None
+                    if not self.enable_fallback:
+                        return None, error
+                    # 处理器失败时立即补上下一个候选处理器
+                    if has_more:
+                        has_more = launch_next()
+        finally:
+            # 取消仍在运行的处理器，其结果会被丢弃
+            for task in pending:
+                task.cancel()
 
         # 如果所有处理器都失败了
         return None, "所有语音处理器都失败"
@@ -140,17 +430,15 @@ class HybridProcessor:
             "processors": list(self.processors.keys()),
             "priority_order": self.priority_order,
             "fallback_enabled": self.enable_fallback,
-            "fallback_counts": self.fallback_count,
+            "fallback_counts": {name: state.fallback_count for name, state in self.state.items()},
+            "circuit_states": {name: state.circuit.name for name, state in self.state.items()},
             "in_cooldown": {}
         }
 
-        current_time = time.time()
-        for processor_name in self.processors.keys():
-            if self.fallback_count.get(processor_name, 0) > 0:
-                status["in_cooldown"][processor_name] = (
-                    current_time - self.last_fallback_time.get(processor_name, 0) < self.fallback_cooldown
-                )
-            else:
-                status["in_cooldown"][processor_name] = False
+        current_time = time.monotonic()
+        for processor_name, state in self.state.items():
+            status["in_cooldown"][processor_name] = (
+                state.circuit is CircuitState.OPEN and current_time < state.reopen_at
+            )
 
         return status
\ No newline at end of file
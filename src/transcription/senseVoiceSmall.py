@@ -1,51 +1,31 @@
+import asyncio
 import os
-import threading
 import time
-from functools import wraps
 
 import dotenv
 import httpx
+import orjson
 
-from src.llm.translate import TranslateProcessor
+from src.llm.translate import get_translate_processor
+from ..utils.eventLoop import run_sync
 from ..utils.logger import logger
 
 dotenv.load_dotenv()
 
-def timeout_decorator(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = [None]
-            error = [None]
-            completed = threading.Event()
-
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    error[0] = e
-                finally:
-                    completed.set()
-
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
-
-            if completed.wait(seconds):
-                if error[0] is not None:
-                    raise error[0]
-                return result[0]
-            raise TimeoutError(f"操作超时 ({seconds}秒)")
-
-        return wrapper
-    return decorator
+TRANSCRIPTION_URL = "https://api.siliconflow.cn/v1/audio/transcriptions"
+
+# 模块级共享客户端：复用 keep-alive 连接，重试和后续请求无需重新握手
+# 仅在 eventLoop 的后台事件循环中使用
+_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+)
 
 class SenseVoiceSmallProcessor:
     # 类级别的配置参数
     DEFAULT_TIMEOUT = 20  # API 超时时间（秒）
     DEFAULT_MODEL = "FunAudioLLM/SenseVoiceSmall"
     
-    def __init__(self):
+    def __init__(self, translate_processor=None):
         api_key = os.getenv("SILICONFLOW_API_KEY")
         assert api_key, "未设置 SILICONFLOW_API_KEY 环境变量"
 
@@ -71,7 +51,9 @@ class SenseVoiceSmallProcessor:
         else:
             self.timeout_seconds = self.DEFAULT_TIMEOUT
 
-        self.translate_processor = TranslateProcessor()
+        # 未指定时使用共享的翻译处理器
+        self.translate_processor = translate_processor or get_translate_processor()
+        self.last_status_code = None  # 最近一次失败请求的 HTTP 状态码，供混合处理器区分错误类型
 
     def _convert_traditional_to_simplified(self, text):
         """将繁体中文转换为简体中文"""
@@ -79,12 +61,11 @@ class SenseVoiceSmallProcessor:
             return text
         return self.cc.convert(text)
 
-    def _call_api(self, audio_data):
+    async def _call_api(self, audio_data):
         """调用硅流 API"""
-        transcription_url = "https://api.siliconflow.cn/v1/audio/transcriptions"
-
+        # 直接传入文件对象，httpx 会按 64KB 分块读取并流式上传，不会先拷贝整段音频
         files = {
-            'file': ('audio.wav', audio_data),
+            'file': ('audio.wav', audio_data, 'audio/wav'),
             'model': (None, self.model)
         }
 
@@ -92,7 +73,7 @@ class SenseVoiceSmallProcessor:
             'Authorization': f"Bearer {os.getenv('SILICONFLOW_API_KEY')}"
         }
 
-        # 设置HTTP客户端超时：根据环境变量动态调整
+        # 设置HTTP请求超时：根据环境变量动态调整
         read_timeout = min(60.0, self.timeout_seconds * 1.5)  # 读取超时，最大60秒
         timeout = httpx.Timeout(
             connect=15.0,      # 连接超时15秒
@@ -106,57 +87,42 @@ class SenseVoiceSmallProcessor:
         max_retries = 2
         for attempt in range(max_retries + 1):
             try:
-                with httpx.Client(timeout=timeout) as client:
-                    logger.info(f"正在上传音频文件到SiliconFlow API (尝试 {attempt + 1}/{max_retries + 1})")
-                    response = client.post(transcription_url, files=files, headers=headers)
-                    response.raise_for_status()
-                    result = response.json().get('text', '获取失败')
-                    logger.info("SiliconFlow API 响应成功")
-                    return result
+                # 重试时需要从头重新上传音频
+                audio_data.seek(0)
+                logger.debug("正在上传音频文件到SiliconFlow API (尝试 %d/%d)", attempt + 1, max_retries + 1)
+                response = await _CLIENT.post(TRANSCRIPTION_URL, files=files, headers=headers, timeout=timeout)
+                response.raise_for_status()
+                result = orjson.loads(response.content).get('text', '获取失败')
+                logger.info("SiliconFlow API 响应成功")
+                return result
             except httpx.TimeoutException as e:
-                logger.warning(f"SiliconFlow API 超时 (尝试 {attempt + 1}/{max_retries + 1}): {e}")
+                logger.warning("SiliconFlow API 超时 (尝试 %d/%d): %s", attempt + 1, max_retries + 1, e)
                 if attempt == max_retries:
                     raise TimeoutError(f"SiliconFlow API 连接超时，已重试 {max_retries} 次")
-                time.sleep(1)  # 重试前等待1秒
+                await asyncio.sleep(1)  # 重试前等待1秒
             except httpx.HTTPStatusError as e:
-                logger.error(f"SiliconFlow API HTTP错误: {e.response.status_code} - {e.response.text}")
+                self.last_status_code = e.response.status_code
+                logger.error("SiliconFlow API HTTP错误: %s - %s", e.response.status_code, e.response.text)
                 raise Exception(f"SiliconFlow API 错误: {e.response.status_code}")
             except Exception as e:
-                logger.warning(f"SiliconFlow API 调用失败 (尝试 {attempt + 1}/{max_retries + 1}): {e}")
+                logger.warning("SiliconFlow API 调用失败 (尝试 %d/%d): %s", attempt + 1, max_retries + 1, e)
                 if attempt == max_retries:
                     raise
-                time.sleep(1)  # 重试前等待1秒
+                await asyncio.sleep(1)  # 重试前等待1秒
 
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt=""):
+        """处理音频（转录或翻译），同步入口
 
-    def _call_api_with_timeout(self, audio_data):
-        """带超时控制的API调用"""
-        def timeout_wrapper():
-            return self._call_api(audio_data)
-
-        result = [None]
-        error = [None]
-        completed = threading.Event()
+        Args:
+            audio_buffer: 音频数据缓冲
+            mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
 
-        def target():
-            try:
-                result[0] = timeout_wrapper()
-            except Exception as e:
-                error[0] = e
-            finally:
-                completed.set()
-
-        thread = threading.Thread(target=target)
-        thread.daemon = True
-        thread.start()
-
-        if completed.wait(self.timeout_seconds):
-            if error[0] is not None:
-                raise error[0]
-            return result[0]
-        else:
-            raise TimeoutError(f"API 请求超时 ({self.timeout_seconds}秒)")
+        Returns:
+            tuple: (结果文本, 错误信息)
+        """
+        return run_sync(self.process_audio_async(audio_buffer, mode, prompt))
 
-    def process_audio(self, audio_buffer, mode="transcriptions", prompt=""):
+    async def process_audio_async(self, audio_buffer, mode="transcriptions", prompt=""):
         """处理音频（转录或翻译）
 
         Args:
@@ -168,16 +134,17 @@ class SenseVoiceSmallProcessor:
             - 如果成功，错误信息为 None
             - 如果失败，结果文本为 None
         """
+        self.last_status_code = None
         try:
             start_time = time.time()
 
             logger.info(f"正在调用 硅基流动 API... (模式: {mode})")
-            result = self._call_api_with_timeout(audio_buffer)
+            result = await asyncio.wait_for(self._call_api(audio_buffer), self.timeout_seconds)
 
             logger.info(f"API 调用成功 ({mode}), 耗时: {time.time() - start_time:.1f}秒")
             # result = self._convert_traditional_to_simplified(result)
             if mode == "translations":
-                result = self.translate_processor.translate(result)
+                result = await asyncio.to_thread(self.translate_processor.translate, result)
             logger.info(f"识别结果: {result}")
 
             # if self.add_symbol:
@@ -189,7 +156,7 @@ class SenseVoiceSmallProcessor:
 
             return result, None
 
-        except TimeoutError:
+        except (TimeoutError, asyncio.TimeoutError):
             error_msg = f"❌ API 请求超时 ({self.timeout_seconds}秒)"
             logger.error(error_msg)
             return None, error_msg
@@ -1,11 +1,9 @@
 import os
-import threading
 import time
-from functools import wraps
 
 import dotenv
 import httpx
-from openai import OpenAI
+from openai import DEFAULT_MAX_RETRIES, APITimeoutError, OpenAI
 from opencc import OpenCC
 
 from ..llm.symbol import SymbolProcessor
@@ -13,41 +11,12 @@ from ..utils.logger import logger
 
 dotenv.load_dotenv()
 
-def timeout_decorator(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = [None]
-            error = [None]
-            completed = threading.Event()
-
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    error[0] = e
-                finally:
-                    completed.set()
-
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
-
-            if completed.wait(seconds):
-                if error[0] is not None:
-                    raise error[0]
-                return result[0]
-            raise TimeoutError(f"操作超时 ({seconds}秒)")
-
-        return wrapper
-    return decorator
-
 class WhisperProcessor:
     # 类级别的配置参数
-    DEFAULT_TIMEOUT = 20  # API 超时时间（秒）
+    REQUEST_TIMEOUT = 10  # HTTP 客户端的超时时间（秒），分别作用于连接、上传、读取各阶段，不是整个请求的总时长
     DEFAULT_MODEL = None
     
-    def __init__(self):
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES):
         api_key = os.getenv("GROQ_API_KEY")
         base_url = os.getenv("GROQ_BASE_URL")
         self.convert_to_simplified = os.getenv("CONVERT_TO_SIMPLIFIED", "false").lower() == "true"
@@ -55,14 +24,17 @@ class WhisperProcessor:
         self.symbol = SymbolProcessor()
         self.add_symbol = os.getenv("ADD_SYMBOL", "false").lower() == "true"
         self.optimize_result = os.getenv("OPTIMIZE_RESULT", "false").lower() == "true"
-        self.timeout_seconds = self.DEFAULT_TIMEOUT
         self.service_platform = os.getenv("SERVICE_PLATFORM", "groq").lower()
 
         if self.service_platform == "groq":
             assert api_key, "未设置 GROQ_API_KEY 环境变量"
+            # 超时由 HTTP 客户端按阶段控制；max_retries 为 SDK 对 429/5xx 的自动重试次数，
+            # 单独使用时保留默认重试，混合模式下传 0，失败后直接切换处理器
             self.client = OpenAI(
                 api_key=api_key,
-                base_url=base_url if base_url else None
+                base_url=base_url if base_url else None,
+                timeout=self.REQUEST_TIMEOUT,
+                max_retries=max_retries
             )
             self.DEFAULT_MODEL = "whisper-large-v3-turbo"
         elif self.service_platform == "siliconflow":
@@ -71,13 +43,14 @@ class WhisperProcessor:
         else:
             raise ValueError(f"未知的平台: {self.service_platform}")
 
+        self.last_status_code = None  # 最近一次失败请求的 HTTP 状态码，供混合处理器区分错误类型
+
     def _convert_traditional_to_simplified(self, text):
         """将繁体中文转换为简体中文"""
         if not self.convert_to_simplified or not text:
             return text
         return self.cc.convert(text)
     
-    @timeout_decorator(10)
     def _call_whisper_api(self, mode, audio_data, prompt):
         """调用 Whisper API"""
         if mode == "translations":
@@ -109,6 +82,7 @@ class WhisperProcessor:
             - 如果成功，错误信息为 None
             - 如果失败，结果文本为 None
         """
+        self.last_status_code = None
         try:
             start_time = time.time()
 
@@ -130,11 +104,13 @@ class WhisperProcessor:
             return result, None
             
 
-        except TimeoutError:
-            error_msg = f"❌ API 请求超时 ({self.timeout_seconds}秒)"
+        except (TimeoutError, APITimeoutError):
+            error_msg = f"❌ API 请求超时 ({self.REQUEST_TIMEOUT}秒)"
             logger.error(error_msg)
             return None, error_msg
         except Exception as e:
+            # OpenAI SDK 的 APIStatusError 带有 status_code
+            self.last_status_code = getattr(e, "status_code", None)
             error_msg = f"❌ {str(e)}"
             logger.error(f"音频处理错误: {str(e)}", exc_info=True)
             return None, error_msg
@@ -1,60 +1,176 @@
 import os
-import threading
 import time
-import json
 import base64
 import hashlib
 import hmac
+import logging
+import ssl
 import wave
 import io
 import uuid
 import asyncio
-from functools import wraps
-from typing import Optional, Callable, Tuple
+from math import gcd
+from email.utils import formatdate
+from typing import Optional, Callable, Tuple, Union
+from urllib.parse import quote
 
 import dotenv
+import orjson
 import websockets
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory
 import numpy as np
 
-from src.llm.translate import TranslateProcessor
-from ..utils.logger import logger
+try:
+    import samplerate
+except ImportError:
+    samplerate = None
 
-dotenv.load_dotenv()
+try:
+    from scipy.signal import resample_poly
+except ImportError:
+    resample_poly = None
 
-def timeout_decorator(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = [None]
-            error = [None]
-            completed = threading.Event()
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    error[0] = e
-                finally:
-                    completed.set()
+from src.llm.translate import get_translate_processor
+from ..utils.eventLoop import run_sync
+from ..utils.logger import logger
 
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
+dotenv.load_dotenv()
 
-            if completed.wait(seconds):
-                if error[0] is not None:
-                    raise error[0]
-                return result[0]
-            raise TimeoutError(f"操作超时 ({seconds}秒)")
+# 安装了 pybase64 时使用其 SIMD 加速实现，接口与标准库一致
+try:
+    from pybase64 import b64encode
+except ImportError:
+    b64encode = base64.b64encode
+
+# 音频数据消息的固定 JSON 片段，按帧状态预先生成（1表示中间帧，2表示最后一帧）
+_AUDIO_FRAME_PREFIX = {
+    status: b'{"data":{"status":%d,"encoding":"raw","format":"audio/L16;rate=16000","audio":"' % status
+    for status in (0, 1, 2)
+}
+_AUDIO_FRAME_SUFFIX = b'"}}'
+
+# 上传的 base64 音频帧较大且可压缩，保留压缩上下文并使用最快的压缩级别；
+# 下载的都是很短的 JSON，服务端每条消息重置上下文，客户端无需维护解压窗口
+_DEFLATE_EXTENSION = ClientPerMessageDeflateFactory(
+    server_no_context_takeover=True,
+    client_max_window_bits=15,
+    compress_settings={"level": 1, "memLevel": 5},
+)
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _resample_hermite_i16(x, out):
+        """4 点三次 Hermite 插值重采样内核，一次遍历直接写入预分配的 int16 输出"""
+        n = len(x)
+        m = len(out)
+        last = n - 1
+        for k in prange(m):
+            # 与 numpy 实现一致，用整数运算得到采样位置
+            scaled = k * last
+            i = scaled // (m - 1)
+            f = np.float32(scaled % (m - 1)) / np.float32(m - 1)
+            # 边界处重复端点采样
+            y_m1 = np.float32(x[max(i - 1, 0)])
+            y0 = np.float32(x[i])
+            y1 = np.float32(x[min(i + 1, last)])
+            y2 = np.float32(x[min(i + 2, last)])
+            c1 = 0.5 * (y1 - y_m1)
+            c2 = y_m1 - 2.5 * y0 + 2.0 * y1 - 0.5 * y2
+            c3 = 0.5 * (y2 - y_m1) + 1.5 * (y0 - y1)
+            v = ((c3 * f + c2) * f + c1) * f + y0
+            out[k] = np.int16(round(max(-32768.0, min(32767.0, v))))
+else:
+    _resample_hermite_i16 = None
+
+def _to_int16(samples: np.ndarray) -> np.ndarray:
+    """原地四舍五入并限幅后转换为 int16，不产生额外的临时数组，也避免截断带来的偏差"""
+    np.rint(samples, out=samples)
+    np.clip(samples, -32768, 32767, out=samples)
+    return samples.astype(np.int16)
+
+
+def _resample(audio_array: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """将 int16 音频重采样到目标采样率
+
+    优先使用 libsamplerate（samplerate 包），其次是 scipy 的多相 FIR 滤波，
+    两者都带抗混叠；都未安装时退回 4 点三次 Hermite 插值（安装了 numba 时使用编译后的内核），
+    相比线性插值对高频的衰减更小
+    """
+    if samplerate is not None:
+        resampled = samplerate.resample(audio_array.astype(np.float32), target_rate / orig_rate, 'sinc_fastest')
+        return _to_int16(resampled)
+
+    if resample_poly is not None:
+        g = gcd(target_rate, orig_rate)
+        resampled = resample_poly(audio_array.astype(np.float32), target_rate // g, orig_rate // g)
+        return _to_int16(resampled)
+
+    # 使用三次 Hermite 插值进行重采样，全程 float32 计算
+    source_length = len(audio_array)
+    target_length = int(source_length * target_rate / orig_rate)
+    if source_length < 2 or target_length < 2:
+        return audio_array[:target_length].copy()
+
+    if _resample_hermite_i16 is not None:
+        out = np.empty(target_length, dtype=np.int16)
+        _resample_hermite_i16(audio_array, out)
+        return out
+
+    # 采样位置的整数部分和小数部分用整数运算得到，长音频也不会丢失精度
+    scaled = np.arange(target_length, dtype=np.int64) * (source_length - 1)
+    left, remainder = np.divmod(scaled, target_length - 1)
+    frac = remainder.astype(np.float32) / np.float32(target_length - 1)
+
+    # 边界处重复端点采样
+    last = source_length - 1
+    samples = audio_array.astype(np.float32)
+    y_m1 = samples[np.maximum(left - 1, 0)]
+    y0 = samples[left]
+    y1 = samples[np.minimum(left + 1, last)]
+    y2 = samples[np.minimum(left + 2, last)]
+
+    c1 = 0.5 * (y1 - y_m1)
+    c2 = y_m1 - 2.5 * y0 + 2 * y1 - 0.5 * y2
+    c3 = 0.5 * (y2 - y_m1) + 1.5 * (y0 - y1)
+    resampled = ((c3 * frac + c2) * frac + c1) * frac + y0
+    return _to_int16(resampled)
+
+
+def _join_words(ws_data):
+    """拼接 ws 数组中的非空识别词"""
+    return "".join(cw["w"] for ws_item in ws_data for cw in ws_item.get("cw", ()) if cw.get("w"))
+
+
+def _cn_ws(cn_data):
+    """取出旧格式 cn.st.rt[0].ws，缺失时返回空元组"""
+    st = cn_data.get("st")
+    rt = st.get("rt") if st else None
+    return rt[0].get("ws", ()) if rt else ()
+
+
+def _extract_text(data):
+    """提取一条响应中的识别文本，兼容新格式 result.ws 和旧格式 cn.st.rt[0].ws"""
+    result = data.get("result")
+    if result:
+        return _join_words(result.get("ws", ()))
+    cn_data = data.get("cn")
+    return _join_words(_cn_ws(cn_data)) if cn_data else ""
 
-        return wrapper
-    return decorator
 
 class XunfeiProcessor:
     DEFAULT_TIMEOUT = 30
     MAX_DURATION = 60  # 讯飞限制60秒
+    AUTH_URL_TTL = 240  # 签名URL复用时长（秒），讯飞允许的时间偏差为300秒
+    FRAME_SIZE = 8000  # 每帧音频字节数（16kHz 16bit 约250ms），与讯飞官方示例一致
+    FRAME_INTERVAL = 0.04  # 帧发送间隔（秒）
 
-    def __init__(self):
+    def __init__(self, translate_processor=None):
         self.app_id = os.getenv("XUNFEI_APP_ID")
         self.api_key = os.getenv("XUNFEI_API_KEY")
         self.api_secret = os.getenv("XUNFEI_API_SECRET")
@@ -65,6 +181,14 @@ class XunfeiProcessor:
         self.host = "iat-api.xfyun.cn"
         self.path = "/v2/iat"
         self.timeout_seconds = self.DEFAULT_TIMEOUT
+        self._auth_cache = None  # (生成时间, 签名URL)
+        # 证书加载只做一次，各次连接共用同一个 TLS 上下文
+        self._ssl_context = ssl.create_default_context()
+        # HMAC 密钥只需处理一次，每次签名复制模板即可
+        self._hmac_template = hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        # 签名原文中只有日期会变化，其余部分预先编码
+        self._sig_prefix = f"host: {self.host}\ndate: ".encode('ascii')
+        self._sig_suffix = f"\nGET {self.path} HTTP/1.1".encode('ascii')
 
         # 支持环境变量配置超时时间
         env_timeout = os.getenv("XUNFEI_TIMEOUT")
@@ -75,40 +199,46 @@ class XunfeiProcessor:
             except ValueError:
                 logger.warning(f"无效的超时配置: {env_timeout}，使用默认值: {self.DEFAULT_TIMEOUT}秒")
 
-        # 初始化翻译处理器
-        self.translate_processor = TranslateProcessor()
+        # 开始消息只依赖 app_id，初始化时编码一次
+        self._start_frame = orjson.dumps(self._create_start_message()).decode('utf-8')
+
+        # 初始化翻译处理器，未指定时使用共享实例
+        self.translate_processor = translate_processor or get_translate_processor()
+        self.last_status_code = None  # 最近一次握手失败的 HTTP 状态码，供混合处理器区分错误类型
 
         logger.info("讯飞语音处理器初始化完成")
 
     def _generate_auth_url(self) -> str:
+        """获取讯飞 WebSocket 认证URL，有效期内复用已签名的URL"""
+        # 签名中的 date 是系统时间，缓存也按系统时间判断是否过期；
+        # 单调时钟在系统休眠期间可能停止，唤醒后会复用早已过期的签名
+        now = time.time()
+        if self._auth_cache and 0 <= now - self._auth_cache[0] < self.AUTH_URL_TTL:
+            return self._auth_cache[1]
+
+        url = self._sign_auth_url()
+        self._auth_cache = (now, url)
+        return url
+
+    def _sign_auth_url(self) -> str:
         """生成讯飞语音听写流式版 WebSocket认证URL"""
-        import datetime
-        import hashlib
-        import hmac
-        import base64
-        from urllib.parse import quote
-
         # 使用RFC1123格式的时间
-        timestamp = datetime.datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-
-        # 构建签名原文
-        signature_origin = f"host: {self.host}\ndate: {timestamp}\nGET {self.path} HTTP/1.1"
+        timestamp = formatdate(usegmt=True)
 
-        # 使用HMAC-SHA256进行加密
-        signature_sha = hmac.new(
-            self.api_secret.encode('utf-8'),
-            signature_origin.encode('utf-8'),
-            hashlib.sha256
-        ).digest()
+        # 使用HMAC-SHA256对签名原文进行加密
+        signer = self._hmac_template.copy()
+        signer.update(self._sig_prefix)
+        signer.update(timestamp.encode('ascii'))
+        signer.update(self._sig_suffix)
 
         # 进行base64编码
-        signature = base64.b64encode(signature_sha).decode('utf-8')
+        signature = b64encode(signer.digest()).decode('ascii')
 
         # 构建authorization_origin
         authorization_origin = f'api_key="{self.api_key}", algorithm="hmac-sha256", headers="host date request-line", signature="{signature}"'
 
         # 进行base64编码
-        authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
+        authorization = b64encode(authorization_origin.encode('utf-8')).decode('ascii')
 
         # URL编码
         authorization_enc = quote(authorization)
@@ -116,42 +246,52 @@ class XunfeiProcessor:
 
         return f"wss://{self.host}{self.path}?authorization={authorization_enc}&date={date_enc}&host={self.host}"
 
-    def _convert_wav_to_pcm(self, wav_data: bytes) -> bytes:
-        """将WAV格式转换为PCM格式，并进行必要的采样率转换"""
+    def _convert_wav_to_pcm(self, audio_buffer: io.BytesIO) -> Union[bytes, memoryview]:
+        """将WAV格式转换为PCM格式，并进行必要的采样率转换
+
+        录音已是讯飞要求的格式时返回缓冲区中音频数据段的只读视图，不复制数据；
+        需要转换时直接在缓冲区上解析采样，返回转换结果的字节视图
+        """
         try:
-            # 使用io.BytesIO处理内存中的WAV数据
-            wav_io = io.BytesIO(wav_data)
+            # 直接从缓冲区读取，避免先复制出整段WAV数据
+            audio_buffer.seek(0)
 
-            with wave.open(wav_io, 'rb') as wav_file:
+            with wave.open(audio_buffer, 'rb') as wav_file:
                 # 获取WAV文件参数
                 params = wav_file.getparams()
-                frames = wav_file.readframes(params.nframes)
 
                 # 检查格式是否满足讯飞要求
                 if params.sampwidth != 2:
                     raise ValueError(f"不支持的位深: {params.sampwidth * 8}bit，需要16bit")
 
-                # 转换为numpy数组进行处理
-                audio_array = np.frombuffer(frames, dtype=np.int16)
+                # 已是讯飞要求的单声道格式时直接使用原始数据，无需经过numpy；
+                # wave 解析完头部后缓冲区正好位于数据块起始处
+                rate_ok = params.framerate in (8000, 16000)
+                start = audio_buffer.tell()
+                # 录音被截断时头部记录的帧数可能多于实际数据，只取实际存在的完整帧
+                buffer = audio_buffer.getbuffer()
+                frames = min(params.nframes, (len(buffer) - start) // (params.sampwidth * params.nchannels))
+                if rate_ok and params.nchannels == 1:
+                    return buffer[start:start + frames * params.sampwidth].toreadonly()
 
-                # 重采样到16kHz（如果需要）
-                if params.framerate not in [8000, 16000]:
-                    target_rate = 16000  # 优先使用16kHz
-                    logger.info(f"正在重采样音频: {params.framerate}Hz -> {target_rate}Hz")
+                # 直接在缓冲区上构造 int16 数组，不经过 readframes 复制
+                audio_array = np.frombuffer(buffer, dtype=np.int16,
+                                            count=frames * params.nchannels, offset=start)
 
-                    # 计算重采样比例
-                    resample_ratio = target_rate / params.framerate
-                    target_length = int(len(audio_array) * resample_ratio)
+                # 多声道混合为单声道
+                if params.nchannels > 1:
+                    audio_array = audio_array.reshape(-1, params.nchannels).mean(axis=1, dtype=np.float32).astype(np.int16)
 
-                    # 使用线性插值进行重采样
-                    original_indices = np.arange(len(audio_array))
-                    target_indices = np.linspace(0, len(audio_array) - 1, target_length)
-                    resampled_audio = np.interp(target_indices, original_indices, audio_array).astype(np.int16)
+                if rate_ok:
+                    return memoryview(audio_array).cast('B')
 
-                    audio_array = resampled_audio
-                    logger.info(f"音频重采样完成: {params.framerate}Hz -> {target_rate}Hz")
+                # 重采样到16kHz
+                target_rate = 16000  # 优先使用16kHz
+                logger.info(f"正在重采样音频: {params.framerate}Hz -> {target_rate}Hz")
+                resampled_audio = _resample(audio_array, params.framerate, target_rate)
+                logger.info(f"音频重采样完成: {params.framerate}Hz -> {target_rate}Hz")
 
-                return audio_array.tobytes()
+                return memoryview(resampled_audio).cast('B')
 
         except Exception as e:
             logger.error(f"WAV转PCM失败: {e}")
@@ -178,183 +318,198 @@ class XunfeiProcessor:
             }
         }
 
-    def _create_audio_message(self, audio_data: str, status: int = 2) -> dict:
-        """创建音频数据消息 - 语音听写流式版格式"""
-        return {
-            "data": {
-                "status": status,  # 1表示中间帧，2表示最后一帧
-                "encoding": "raw",
-                "audio": audio_data,
-                "format": "audio/L16;rate=16000"
-            }
-        }
+    def _encode_audio_frame(self, pcm_chunk: bytes, status: int = 2) -> str:
+        """编码音频数据消息 - 语音听写流式版格式
 
-    @timeout_decorator(30)
-    def _call_api_websocket(self, pcm_data: bytes,
-                           on_partial_result: Optional[Callable[[str], None]] = None) -> str:
-        """通过WebSocket调用讯飞Spark API"""
+        直接拼接 JSON 文本，base64 结果不再经过一次 JSON 序列化和字符串转换
+        """
+        return (_AUDIO_FRAME_PREFIX[status] + b64encode(pcm_chunk) + _AUDIO_FRAME_SUFFIX).decode('ascii')
 
-        async def websocket_call():
-            uri = self._generate_auth_url()
+    async def _send_audio(self, websocket, pcm_data: bytes):
+        """发送开始消息和音频数据
 
+        音频按 FRAME_SIZE 分帧发送，服务端边接收边识别，
+        中间结果在上传过程中即可通过 on_partial_result 返回
+        """
+        # 1. 发送开始消息
+        logger.info("发送开始消息...")
+        await websocket.send(self._start_frame)
+
+        # 2. 分帧发送音频数据，status=1表示中间帧，status=2表示最后一帧；讯飞要求文本帧，因此发送 str
+        logger.info("发送音频数据...")
+        pcm_view = memoryview(pcm_data)
+        total = len(pcm_view)
+        offset = 0
+        while True:
+            end = offset + self.FRAME_SIZE
+            status = 2 if end >= total else 1
+            await websocket.send(self._encode_audio_frame(pcm_view[offset:end], status=status))
+            if status == 2:
+                break
+            offset = end
+            await asyncio.sleep(self.FRAME_INTERVAL)
+
+    async def _receive_results(self, websocket,
+                               on_partial_result: Optional[Callable[[str], None]] = None) -> str:
+        """接收并解析识别结果，直到收到最后一帧或连接关闭"""
+        final_result = ""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds  # 使用配置的超时时间
+
+        while True:
+            # 直接等待下一条消息直到截止时间，不再每0.1秒轮询一次
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"等待识别结果超时 ({self.timeout_seconds}秒)")
+                break
             try:
-                async with websockets.connect(uri, ping_timeout=self.timeout_seconds, close_timeout=self.timeout_seconds) as websocket:
-                    logger.info("WebSocket连接成功")
-
-                    # 接收识别结果
-                    final_result = ""
-                    try:
-                        # 1. 发送开始消息
-                        logger.info("发送开始消息...")
-                        start_message = self._create_start_message()
-                        await websocket.send(json.dumps(start_message))
-
-                        # 2. 等待服务器确认
-                        try:
-                            response = await asyncio.wait_for(websocket.recv(), timeout=5)
-                            result_data = json.loads(response)
-                            logger.debug(f"服务器确认: {result_data}")
-
-                            if str(result_data.get("code", "")) != "0":
-                                error_msg = result_data.get("message", "未知错误")
-                                logger.debug(f"服务器响应: code={result_data.get('code')}, message={error_msg}")
-                                # 不抛出异常，继续处理
-                        except asyncio.TimeoutError:
-                            logger.warning("服务器确认超时，继续发送音频...")
-
-                        # 3. 发送音频数据
-                        logger.info("发送音频数据...")
-                        audio_b64 = base64.b64encode(pcm_data).decode('utf-8')
-                        audio_message = self._create_audio_message(audio_b64, status=2)  # status=2表示最后一帧
-                        await websocket.send(json.dumps(audio_message))
-
-                        # 2. 等待并接收识别结果
-                        timeout_count = 0
-                        max_wait_time = self.timeout_seconds  # 使用配置的超时时间
-
-                        while timeout_count < max_wait_time * 10:  # 每0.1秒检查一次
-                            try:
-                                response = await asyncio.wait_for(websocket.recv(), timeout=0.1)
-                                result_data = json.loads(response)
-
-                                logger.info(f"收到响应: code={result_data.get('code', 'N/A')}, status={result_data.get('data', {}).get('status', 'N/A')}")
-                                logger.debug(f"完整响应: {result_data}")
-
-                                # 解析语音听写流式版API响应格式
-                                if "code" in result_data and "data" in result_data:
-                                    # 标准响应格式
-                                    code = str(result_data.get("code", ""))
-                                    data = result_data.get("data", {})
-                                    sid = result_data.get("sid", "")
-
-                                    if code == "0":
-                                        # 成功响应，解析data字段
-                                        if isinstance(data, dict):
-                                            # 新格式：data.result.ws
-                                            if "result" in data and "ws" in data["result"]:
-                                                ws_data = data["result"]["ws"]
-                                                current_text = ""
-                                                for ws_item in ws_data:
-                                                    for cw_item in ws_item.get("cw", []):
-                                                        word = cw_item.get("w", "")
-                                                        if word:  # 只添加非空的词
-                                                            current_text += word
-
-                                                if current_text:
-                                                    final_result = current_text
-                                                    if on_partial_result:
-                                                        on_partial_result(current_text)
-                                                    logger.info(f"识别结果: {current_text}")
-
-                                            # 旧格式：data.cn
-                                            elif "cn" in data:
-                                                cn_data = data["cn"]
-                                                if "st" in cn_data and "rt" in cn_data["st"]:
-                                                    rt_data = cn_data["st"]["rt"]
-                                                    if rt_data and len(rt_data) > 0:
-                                                        ws_data = rt_data[0].get("ws", [])
-                                                        current_text = ""
-                                                        for ws_item in ws_data:
-                                                            for cw_item in ws_item.get("cw", []):
-                                                                current_text += cw_item.get("w", "")
-
-                                                        if current_text:
-                                                            final_result = current_text
-                                                            if on_partial_result:
-                                                                on_partial_result(current_text)
-                                                            logger.info(f"识别结果: {current_text}")
-
-                                        # 检查是否是最终结果
-                                        if data.get("status", 0) == 2:  # status=2表示最后一帧
-                                            logger.info("收到最终结果，结束识别")
-                                            break
-                                    else:
-                                        logger.error(f"API错误: code={code}, sid={sid}")
-                                        break
-
-                                elif "cn" in result_data:
-                                    # 直接返回语音听写格式
-                                    cn_data = result_data["cn"]
-                                    if "st" in cn_data and "rt" in cn_data["st"]:
-                                        rt_data = cn_data["st"]["rt"]
-                                        if rt_data and len(rt_data) > 0:
-                                            ws_data = rt_data[0].get("ws", [])
-                                            current_text = ""
-                                            for ws_item in ws_data:
-                                                for cw_item in ws_item.get("cw", []):
-                                                    current_text += cw_item.get("w", "")
-
-                                            if current_text:
-                                                final_result = current_text
-                                                if on_partial_result:
-                                                    on_partial_result(current_text)
-                                                logger.info(f"识别结果: {current_text}")
-
-                                elif "code" in result_data:
-                                    # 错误响应或其他响应
-                                    code = str(result_data.get("code", ""))
-                                    message = result_data.get("message", "")
-                                    if code != "0":
-                                        logger.debug(f"API响应: code={code}, message={message}")
-                                        # code=0 是成功，其他是调试信息
-
-                            except asyncio.TimeoutError:
-                                timeout_count += 1
-                                if timeout_count % 50 == 0:  # 每5秒打印一次
-                                    logger.debug(f"等待结果... ({timeout_count/10:.1f}s)")
-                            except websockets.exceptions.ConnectionClosed:
-                                logger.info("WebSocket连接关闭")
+                response = await asyncio.wait_for(websocket.recv(), timeout=remaining)
+                result_data = orjson.loads(response)
+
+                code = result_data.get("code")
+                data = result_data.get("data")
+                # 每帧响应都会经过这里，未开启 DEBUG 时跳过参数计算和格式化
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("收到响应: code=%s, status=%s", code, data.get("status") if data else None)
+                    logger.debug("完整响应: %s", result_data)
+
+                # 解析语音听写流式版API响应格式
+                if code is not None and data is not None:
+                    # 标准响应格式
+                    if str(code) == "0":
+                        # 成功响应，解析data字段
+                        if isinstance(data, dict):
+                            current_text = _extract_text(data)
+                            if current_text:
+                                final_result = current_text
+                                if on_partial_result:
+                                    on_partial_result(current_text)
+                                logger.debug("中间识别结果: %s", current_text)
+
+                            # 检查是否是最终结果
+                            if data.get("status", 0) == 2:  # status=2表示最后一帧
+                                logger.info("收到最终结果，结束识别")
                                 break
-                            except json.JSONDecodeError:
-                                # 如果不是JSON，可能是纯文本响应
-                                if response and response.strip():
-                                    final_result = response
-                                    if on_partial_result:
-                                        on_partial_result(response)
-                                    logger.info(f"识别结果: {response}")
-                                    break
-
-                    except Exception as e:
-                        logger.error(f"处理响应时出错: {e}")
-
-                    return final_result
-
-            except Exception as e:
-                logger.error(f"WebSocket通信失败: {e}")
-                raise
+                    else:
+                        logger.error(f"API错误: code={code}, sid={result_data.get('sid', '')}")
+                        break
+
+                elif "cn" in result_data:
+                    # 直接返回语音听写格式
+                    current_text = _extract_text(result_data)
+                    if current_text:
+                        final_result = current_text
+                        if on_partial_result:
+                            on_partial_result(current_text)
+                        logger.debug("中间识别结果: %s", current_text)
+
+                elif code is not None and str(code) != "0":
+                    # 错误响应或其他响应，code=0 是成功，其他是调试信息
+                    logger.debug("API响应: code=%s, message=%s", code, result_data.get("message", ""))
+
+            except asyncio.TimeoutError:
+                logger.warning(f"等待识别结果超时 ({self.timeout_seconds}秒)")
+                break
+            except websockets.exceptions.ConnectionClosed:
+                logger.info("WebSocket连接关闭")
+                break
+            except orjson.JSONDecodeError:
+                # 如果不是JSON，可能是纯文本响应
+                if response and response.strip():
+                    final_result = response
+                    if on_partial_result:
+                        on_partial_result(response)
+                    logger.info(f"识别结果: {response}")
+                    break
+
+        return final_result
+
+    async def _open_websocket(self):
+        """建立到讯飞的 WebSocket 连接并完成握手"""
+        return await websockets.connect(self._generate_auth_url(), ssl=self._ssl_context,
+                                        extensions=[_DEFLATE_EXTENSION],
+                                        ping_timeout=self.timeout_seconds, close_timeout=self.timeout_seconds)
+
+    @staticmethod
+    def _discard_connection(connecting: asyncio.Future):
+        """放弃尚未使用的连接：握手中的直接取消，已建立的在后台关闭"""
+        def close(task):
+            if not task.cancelled() and task.exception() is None:
+                asyncio.ensure_future(task.result().close())
+
+        connecting.cancel()
+        connecting.add_done_callback(close)
+
+    async def _call_api_websocket_async(self, pcm_data: bytes,
+                                        on_partial_result: Optional[Callable[[str], None]] = None,
+                                        connecting: Optional[asyncio.Future] = None) -> str:
+        """通过WebSocket调用讯飞语音听写API
+
+        发送和接收在两个并发任务中进行，服务器的响应无需等到音频发送完毕才开始处理。
+        connecting 为提前发起的连接任务，未提供时在这里建立连接
+        """
+        if connecting is None:
+            connecting = asyncio.ensure_future(self._open_websocket())
 
-        # 运行异步WebSocket调用
-        import asyncio
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            async with (await connecting) as websocket:
+                logger.info("WebSocket连接成功")
+
+                send_task = asyncio.create_task(self._send_audio(websocket, pcm_data))
+                recv_task = asyncio.create_task(self._receive_results(websocket, on_partial_result))
+                sent = False
+                try:
+                    await send_task
+                    sent = True
+                except Exception as e:
+                    # 音频未发送完整时服务器不会返回最终结果，不再等待接收
+                    logger.error(f"发送音频时出错: {e}")
+                    return ""
+                finally:
+                    # 发送失败或被取消时一并结束接收任务，避免其等到连接超时且异常无人读取
+                    if not sent:
+                        send_task.cancel()
+                        recv_task.cancel()
+                        await asyncio.wait((send_task, recv_task))
 
-        return loop.run_until_complete(websocket_call())
+                try:
+                    return await recv_task
+                except Exception as e:
+                    logger.error(f"处理响应时出错: {e}")
+                    return ""
+
+        except websockets.exceptions.InvalidStatus as e:
+            # 握手被拒绝，401/403 通常表示认证信息错误或签名过期
+            self.last_status_code = e.response.status_code
+            self._auth_cache = None  # 被拒绝的签名URL不再复用
+            logger.error(f"WebSocket握手失败: HTTP {self.last_status_code}")
+            raise
+        except Exception as e:
+            logger.error(f"WebSocket通信失败: {e}")
+            raise
+
+    def _call_api_websocket(self, pcm_data: bytes,
+                           on_partial_result: Optional[Callable[[str], None]] = None) -> str:
+        """同步调用入口，供旧的同步调用方使用"""
+        return run_sync(self._call_api_websocket_async(pcm_data, on_partial_result), timeout=self.timeout_seconds)
 
     def process_audio(self, audio_buffer, mode="transcriptions", prompt="",
                      on_partial_result: Optional[Callable[[str], None]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """处理音频（转录或翻译），同步入口
+
+        Args:
+            audio_buffer: 音频数据缓冲 (WAV格式)
+            mode: 'transcriptions' 或 'translations'
+            prompt: 提示词（讯飞暂不支持）
+            on_partial_result: 实时结果回调函数
+
+        Returns:
+            tuple: (结果文本, 错误信息)
+        """
+        return run_sync(self.process_audio_async(audio_buffer, mode, prompt, on_partial_result))
+
+    async def process_audio_async(self, audio_buffer, mode="transcriptions", prompt="",
+                                  on_partial_result: Optional[Callable[[str], None]] = None) -> Tuple[Optional[str], Optional[str]]:
         """处理音频（转录或翻译）
 
         Args:
@@ -366,6 +521,8 @@ class XunfeiProcessor:
         Returns:
             tuple: (结果文本, 错误信息)
         """
+        self.last_status_code = None
+        pcm_data = None
         try:
             start_time = time.time()
 
@@ -379,24 +536,33 @@ class XunfeiProcessor:
 
             logger.info(f"正在调用讯飞语音API... (模式: {mode})")
 
+            # 讯飞每个连接只处理一次识别，无法复用连接；
+            # 这里提前发起握手，使其与音频格式转换并行进行
+            connecting = asyncio.ensure_future(self._open_websocket())
+
             # 将WAV转换为PCM
-            pcm_data = self._convert_wav_to_pcm(audio_buffer.read())
+            try:
+                pcm_data = await asyncio.to_thread(self._convert_wav_to_pcm, audio_buffer)
+            except BaseException:
+                self._discard_connection(connecting)
+                raise
             logger.info(f"音频格式转换完成，数据大小: {len(pcm_data)} bytes")
 
-            # 调用讯飞API
-            result = self._call_api_websocket(pcm_data, on_partial_result)
+            # 调用讯飞API，整个 WebSocket 交互受 timeout_seconds 限制
+            result = await asyncio.wait_for(
+                self._call_api_websocket_async(pcm_data, on_partial_result, connecting), self.timeout_seconds)
 
             logger.info(f"讯飞API调用成功 ({mode})，耗时: {time.time() - start_time:.1f}秒")
             logger.info(f"识别结果: {result}")
 
             # 如果是翻译模式，使用翻译处理器
             if mode == "translations":
-                result = self.translate_processor.translate(result)
+                result = await asyncio.to_thread(self.translate_processor.translate, result)
                 logger.info(f"翻译结果: {result}")
 
             return result, None
 
-        except TimeoutError:
+        except (TimeoutError, asyncio.TimeoutError):
             error_msg = f"❌ 讯飞API请求超时 ({self.timeout_seconds}秒)"
             logger.error(error_msg)
             return None, error_msg
@@ -405,7 +571,10 @@ class XunfeiProcessor:
             logger.error(error_msg, exc_info=True)
             return None, error_msg
         finally:
+            # 释放对缓冲区的视图，否则缓冲区无法关闭
+            if isinstance(pcm_data, memoryview):
+                pcm_data.release()
             try:
                 audio_buffer.close()
             except:
-                pass
\ No newline at end of file
+                pass
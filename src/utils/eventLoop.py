@@ -0,0 +1,41 @@
+"""后台事件循环
+在守护线程中运行一个常驻的 asyncio 事件循环，同步代码通过 run_sync 提交协程。
+事件循环在多次调用之间保持不变，与其绑定的连接等资源可以复用
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+try:
+    import uvloop
+except ImportError:  # Windows 上不可用
+    uvloop = None
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """获取（必要时启动）后台事件循环"""
+    global _loop
+    with _lock:
+        if _loop is None:
+            # 安装了 uvloop 时使用基于 libuv 的事件循环，套接字 I/O 开销更低
+            _loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-loop", daemon=True).start()
+    return _loop
+
+
+def run_sync(coro, timeout=None):
+    """在后台事件循环中运行协程，阻塞等待并返回结果
+
+    超过 timeout 秒时取消协程并抛出 TimeoutError。
+    不能在后台事件循环所在线程中调用，否则会死锁
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"操作超时 ({timeout}秒)") from None
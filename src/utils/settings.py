@@ -0,0 +1,60 @@
+"""应用配置
+首次访问时解析 .env，之后直接复用缓存的配置对象
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import dotenv
+
+from .logger import logger
+
+
+@dataclass(frozen=True)
+class Settings:
+    """从环境变量解析出的只读配置"""
+    enable_fallback: bool
+    fallback_cooldown: float
+    keep_original_clipboard: bool
+    select_delete: bool
+    enable_siliconflow: bool
+    enable_xunfei: bool
+    enable_groq: bool
+    xunfei_app_id: Optional[str]
+    xunfei_api_key: Optional[str]
+    xunfei_api_secret: Optional[str]
+
+
+def _get_bool(name, default):
+    return os.getenv(name, default).lower() == "true"
+
+
+def _get_float(name, default):
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"无效的配置 {name}={value}，使用默认值: {default}")
+        return default
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """解析 .env 并返回缓存的配置"""
+    dotenv.load_dotenv()
+    return Settings(
+        enable_fallback=_get_bool("ENABLE_FALLBACK", "true"),
+        fallback_cooldown=_get_float("FALLBACK_COOLDOWN", 300.0),
+        keep_original_clipboard=_get_bool("KEEP_ORIGINAL_CLIPBOARD", "true"),
+        select_delete=_get_bool("SELECT_DELETE", "false"),
+        enable_siliconflow=_get_bool("ENABLE_SILICONFLOW", "true"),
+        enable_xunfei=_get_bool("ENABLE_XUNFEI", "true"),
+        enable_groq=_get_bool("ENABLE_GROQ", "true"),
+        xunfei_app_id=os.getenv("XUNFEI_APP_ID"),
+        xunfei_api_key=os.getenv("XUNFEI_API_KEY"),
+        xunfei_api_secret=os.getenv("XUNFEI_API_SECRET"),
+    )
@@ -5,7 +5,7 @@
 
 import time
 import pyperclip
-from pynput.keyboard import Controller
+from pynput.keyboard import Controller, Key
 
 def test_text_deletion():
     """测试文本删除功能"""
@@ -33,11 +33,14 @@ def test_text_deletion():
     text_length = len(test_text)
     print(f"文本长度: {text_length}")
 
-    for i in range(text_length):
-        keyboard.press(Key.backspace)
-        keyboard.release(Key.backspace)
-        time.sleep(0.02)  # 短暂延迟
-        print(f"删除进度: {i+1}/{text_length}")
+    # 与 KeyboardManager 开启 SELECT_DELETE 时相同：按住 Shift 左移选中文本后一次性删除，不逐字符等待
+    with keyboard.pressed(Key.shift):
+        for _ in range(text_length):
+            keyboard.press(Key.left)
+            keyboard.release(Key.left)
+    keyboard.press(Key.backspace)
+    keyboard.release(Key.backspace)
+    time.sleep(0.02)  # 整批按键结束后统一等待一次
 
     time.sleep(0.5)
 
@@ -53,5 +56,4 @@ def test_text_deletion():
     print("✨ 测试完成！")
 
 if __name__ == "__main__":
-    from pynput.keyboard import Key
     test_text_deletion()
\ No newline at end of file
@@ -9,6 +9,9 @@ import sys
 import time
 import wave
 import io
+from math import gcd
+
+import numpy as np
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -23,15 +26,17 @@ from src.utils.logger import logger
 
 def create_test_audio(duration=3, sample_rate=16000):
     """创建测试音频文件（简单的正弦波）"""
-    import numpy as np
-
-    # 生成测试音频数据
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    # 生成440Hz的正弦波（A音）
-    audio_data = np.sin(2 * np.pi * 440 * t) * 0.3
-
-    # 转换为16位整数
-    audio_data = (audio_data * 32767).astype(np.int16)
+    # 生成440Hz的正弦波（A音），每 sample_rate / gcd(sample_rate, 440) 个采样点精确重复一次，
+    # 只计算一个周期，其余部分按周期平铺复制
+    period = sample_rate // gcd(sample_rate, 440)
+    # 相位、正弦和缩放都在同一个 float32 数组上原地完成，不产生临时数组
+    t = np.arange(period, dtype=np.float32)
+    t *= np.float32(2 * np.pi * 440 / sample_rate)
+    np.sin(t, out=t)
+
+    # 乘以幅度后转换为16位整数
+    t *= np.float32(0.3 * 32767)
+    audio_data = np.resize(t.astype(np.int16), int(sample_rate * duration))
 
     # 创建WAV文件
     buffer = io.BytesIO()
@@ -39,7 +44,8 @@ def create_test_audio(duration=3, sample_rate=16000):
         wav_file.setnchannels(1)  # 单声道
         wav_file.setsampwidth(2)  # 16位
         wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio_data.tobytes())
+        # 直接传入数组缓冲区的视图，不先复制成 bytes
+        wav_file.writeframes(audio_data.data)
 
     buffer.seek(0)
     return buffer
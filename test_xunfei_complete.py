@@ -3,10 +3,15 @@
 讯飞语音识别完整测试脚本
 """
 
+import io
 import os
+import struct
 import sys
 import time
-import wave
+import traceback
+from functools import lru_cache
+from math import gcd
+
 import numpy as np
 from dotenv import load_dotenv
 
@@ -14,27 +19,34 @@ from dotenv import load_dotenv
 load_dotenv()
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def create_test_audio(duration=3, sample_rate=16000):
-    """创建测试音频WAV文件"""
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    # 创建一个简单的正弦波，模拟人声频率
-    audio_data = np.sin(2 * np.pi * 440 * t) * 0.3  # 440Hz音调
-
-    # 转换为16位整数
-    audio_data = (audio_data * 32767).astype(np.int16)
+from src.transcription.xunfei import XunfeiProcessor
+
+@lru_cache(maxsize=8)
+def _build_test_wav(duration, sample_rate):
+    """生成测试音频的WAV字节，相同参数只生成一次"""
+    # 创建一个简单的440Hz正弦波，模拟人声频率，并转换为16位整数
+    # 440Hz 正弦波每 sample_rate / gcd(sample_rate, 440) 个采样点精确重复一次，
+    # 只计算一个周期，其余部分按周期平铺复制
+    period = sample_rate // gcd(sample_rate, 440)
+    # 相位、正弦、缩放和取整都在同一个 float32 数组上原地完成，不产生临时数组
+    t = np.arange(period, dtype=np.float32)
+    t *= np.float32(2 * np.pi * 440 / sample_rate)
+    np.sin(t, out=t)
+    t *= np.float32(0.3 * 32767)
+    np.rint(t, out=t)
+    pcm = np.resize(t.astype('<i2'), int(sample_rate * duration))
+
+    # 直接拼接 44 字节的 WAV 头：单声道、16位
+    header = struct.pack('<4sI4s4sIHHIIHH4sI',
+                         b'RIFF', 36 + pcm.nbytes, b'WAVE',
+                         b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+                         b'data', pcm.nbytes)
+    # 采样数组的缓冲区直接拼接到头部之后，不先复制成 bytes
+    return header + pcm.data
 
-    # 创建WAV文件数据
-    import io
-    wav_buffer = io.BytesIO()
-
-    with wave.open(wav_buffer, 'wb') as wav_file:
-        wav_file.setnchannels(1)  # 单声道
-        wav_file.setsampwidth(2)  # 16位
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio_data.tobytes())
-
-    wav_buffer.seek(0)
-    return wav_buffer
+def create_test_audio(duration=3, sample_rate=16000):
+    """创建测试音频WAV文件，每次返回独立的缓冲区"""
+    return io.BytesIO(_build_test_wav(duration, sample_rate))
 
 def test_xunfei_complete():
     """完整测试讯飞语音识别"""
@@ -42,7 +54,6 @@ def test_xunfei_complete():
     print("=" * 50)
 
     try:
-        from src.transcription.xunfei import XunfeiProcessor
         processor = XunfeiProcessor()
 
         # 创建测试音频
@@ -75,9 +86,10 @@ def test_xunfei_complete():
             return True
 
     except Exception as e:
-        print(f"❌ 测试失败: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"❌ 测试失败: {type(e).__name__}: {e}")
+        # 完整堆栈只在设置 VERBOSE 时输出
+        if os.getenv("VERBOSE"):
+            traceback.print_exc()
         return False
 
 if __name__ == "__main__":
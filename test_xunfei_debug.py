@@ -5,69 +5,76 @@
 
 import os
 import sys
+import traceback
 import json
+import binascii
+import ssl
 import asyncio
+import orjson
 import websockets
+from email.utils import formatdate
+from urllib.parse import quote
 from dotenv import load_dotenv
 
+from xunfei_test_auth import get_hmac_template
+
 load_dotenv()
 
-async def test_xunfei_debug():
+_HOST = "rtasr.xfyun.cn"
+_PATH = "/v1"
+# 签名原文中只有日期每次变化，其余部分预先编码
+_SIG_TEMPLATE = f"host: {_HOST}\ndate: %s\nGET {_PATH} HTTP/1.1".encode('utf-8')
+
+# TLS 上下文只创建一次，证书只加载一次
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.set_alpn_protocols(["http/1.1"])
+
+# 开始消息 - RTASR格式，内容固定，只编码一次
+_START_MESSAGE = {
+    "data": {
+        "status": 0,  # 0表示第一帧
+        "encoding": "raw",
+        "audio": "",
+        "format": "audio/L16;rate=16000"
+    }
+}
+_START_FRAME = orjson.dumps(_START_MESSAGE).decode('utf-8')
+
+async def test_xunfei_debug(ssl_context=_SSL_CTX):
     """调试讯飞API连接和消息格式"""
     app_id = os.getenv("XUNFEI_APP_ID")
     api_key = os.getenv("XUNFEI_API_KEY")
     api_secret = os.getenv("XUNFEI_API_SECRET")
-    host = "rtasr.xfyun.cn"
-    path = "/v1"
 
     print("=== 讯飞API调试测试 ===")
 
     # 生成认证URL
-    import datetime
-    import hashlib
-    import hmac
-    import base64
-    from urllib.parse import quote
-
-    timestamp = datetime.datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-    signature_origin = f"host: {host}\ndate: {timestamp}\nGET {path} HTTP/1.1"
-    signature_sha = hmac.new(
-        api_secret.encode('utf-8'),
-        signature_origin.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    signature = base64.b64encode(signature_sha).decode('utf-8')
+    timestamp = formatdate(usegmt=True)
+    signer = get_hmac_template().copy()
+    signer.update(_SIG_TEMPLATE % timestamp.encode('ascii'))
+    signature_sha = signer.digest()
+    signature = binascii.b2a_base64(signature_sha, newline=False).decode('ascii')
     authorization_origin = f'api_key="{api_key}", algorithm="hmac-sha256", headers="host date request-line", signature="{signature}"'
-    authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
+    authorization = binascii.b2a_base64(authorization_origin.encode('utf-8'), newline=False).decode('ascii')
     authorization_enc = quote(authorization)
 
-    uri = f"wss://{host}{path}?authorization={authorization_enc}&date={quote(timestamp)}&host={host}"
+    uri = f"wss://{_HOST}{_PATH}?authorization={authorization_enc}&date={quote(timestamp)}&host={_HOST}"
     print(f"连接URL: {uri}")
 
     try:
         print("尝试连接WebSocket...")
-        async with websockets.connect(uri, ping_timeout=30, close_timeout=30) as websocket:
+        async with websockets.connect(uri, ssl=ssl_context, ping_timeout=30, close_timeout=30) as websocket:
             print("✅ WebSocket连接成功！")
 
-            # 创建开始消息 - RTASR格式
-            start_message = {
-                "data": {
-                    "status": 0,  # 0表示第一帧
-                    "encoding": "raw",
-                    "audio": "",
-                    "format": "audio/L16;rate=16000"
-                }
-            }
-
-            print(f"发送开始消息: {json.dumps(start_message, indent=2, ensure_ascii=False)}")
-            await websocket.send(json.dumps(start_message))
+            print(f"发送开始消息: {json.dumps(_START_MESSAGE, indent=2, ensure_ascii=False)}")
+            await websocket.send(_START_FRAME)
             print("开始消息已发送")
 
             # 接收服务器响应
             try:
                 response = await asyncio.wait_for(websocket.recv(), timeout=10)
                 print(f"收到服务器响应: {response}")
-                result_data = json.loads(response)
+                result_data = orjson.loads(response)
                 print(f"解析后的响应: {json.dumps(result_data, indent=2, ensure_ascii=False)}")
 
                 # 检查响应状态
@@ -86,9 +93,10 @@ async def test_xunfei_debug():
                 return False
 
     except Exception as e:
-        print(f"❌ WebSocket连接失败: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"❌ WebSocket连接失败: {type(e).__name__}: {e}")
+        # 完整堆栈只在设置 VERBOSE 时输出
+        if os.getenv("VERBOSE"):
+            traceback.print_exc()
         return False
 
 if __name__ == "__main__":
@@ -6,25 +6,34 @@
 import os
 import sys
 import time
-import json
-import base64
-import hashlib
-import hmac
+import binascii
+import ssl
 import asyncio
+import orjson
 import websockets
+from email.utils import formatdate
 from urllib.parse import quote
 
 from dotenv import load_dotenv
 
+from xunfei_test_auth import get_hmac_template
+
 load_dotenv()
 
-async def test_xunfei_connection():
+_HOST = "iat.xf-yun.com"
+_PATH = "/v1/iat"
+# 签名原文中只有日期每次变化，其余部分预先编码
+_SIG_TEMPLATE = f"host: {_HOST}\ndate: %s\nGET {_PATH} HTTP/1.1\nappid: {os.getenv('XUNFEI_APP_ID')}".encode('utf-8')
+
+# TLS 上下文只创建一次，证书只加载一次
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.set_alpn_protocols(["http/1.1"])
+
+async def test_xunfei_connection(ssl_context=_SSL_CTX):
     """测试讯飞WebSocket连接"""
     app_id = os.getenv("XUNFEI_APP_ID")
     api_key = os.getenv("XUNFEI_API_KEY")
     api_secret = os.getenv("XUNFEI_API_SECRET")
-    host = "iat.xf-yun.com"
-    path = "/v1/iat"
 
     print("=== 讯飞API连接测试 ===")
     print(f"APPID: {app_id}")
@@ -33,27 +42,23 @@ async def test_xunfei_connection():
     print()
 
     # 生成认证URL
-    import datetime
-    timestamp = datetime.datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-    signature_origin = f"host: {host}\ndate: {timestamp}\nGET {path} HTTP/1.1\nappid: {app_id}"
-    signature_sha = hmac.new(
-        api_secret.encode('utf-8'),
-        signature_origin.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    signature = base64.b64encode(signature_sha).decode('utf-8')
+    timestamp = formatdate(usegmt=True)
+    signer = get_hmac_template().copy()
+    signer.update(_SIG_TEMPLATE % timestamp.encode('ascii'))
+    signature_sha = signer.digest()
+    signature = binascii.b2a_base64(signature_sha, newline=False).decode('ascii')
 
     authorization_origin = f'api_key="{api_key}", algorithm="hmac-sha256", headers="host date request-line appid", signature="{signature}"'
-    authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
+    authorization = binascii.b2a_base64(authorization_origin.encode('utf-8'), newline=False).decode('ascii')
     authorization_enc = quote(authorization)
 
-    uri = f"wss://{host}{path}?authorization={authorization_enc}&date={quote(timestamp)}&host={host}&appid={app_id}"
+    uri = f"wss://{_HOST}{_PATH}?authorization={authorization_enc}&date={quote(timestamp)}&host={_HOST}&appid={app_id}"
     print(f"WebSocket URL: {uri}")
     print()
 
     try:
         print("尝试连接WebSocket...")
-        async with websockets.connect(uri, ping_timeout=30, close_timeout=30) as websocket:
+        async with websockets.connect(uri, ssl=ssl_context, ping_timeout=30, close_timeout=30) as websocket:
             print("✅ WebSocket连接成功！")
 
             # 发送开始消息
@@ -88,7 +93,7 @@ async def test_xunfei_connection():
             }
 
             print("发送开始消息...")
-            await websocket.send(json.dumps(start_message))
+            await websocket.send(orjson.dumps(start_message).decode('utf-8'))
             print("✅ 开始消息发送成功")
 
             # 等待响应
@@ -6,97 +6,119 @@
 import os
 import sys
 import time
-import json
-import base64
-import hashlib
-import hmac
+import binascii
+import ssl
 import asyncio
+import orjson
 import websockets
 import numpy as np
+from functools import lru_cache
+from math import gcd
+from email.utils import formatdate
 from urllib.parse import quote
 
 from dotenv import load_dotenv
 
+from xunfei_test_auth import get_hmac_template
+
 load_dotenv()
 
+_HOST = "iat-api.xfyun.cn"
+_PATH = "/v2/iat"
+# 签名原文中只有日期每次变化，其余部分预先编码
+_SIG_TEMPLATE = f"host: {_HOST}\ndate: %s\nGET {_PATH} HTTP/1.1\napp_id: {os.getenv('XUNFEI_APP_ID')}".encode('utf-8')
+
+# TLS 上下文只创建一次，证书只加载一次
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.set_alpn_protocols(["http/1.1"])
+
+# 格式1的开始帧内容固定，只编码一次
+_FORMAT1_FRAME = orjson.dumps({
+    "data": {
+        "status": 0,
+        "audio": "",
+        "encoding": "raw"
+    }
+}).decode('utf-8')
+
+@lru_cache(maxsize=8)
 def create_test_audio(duration=3, sample_rate=16000):
-    """创建测试音频数据"""
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    audio_data = np.sin(2 * np.pi * 440 * t) * 0.3
-    audio_data = (audio_data * 32767).astype(np.int16)
-    return base64.b64encode(audio_data.tobytes()).decode('utf-8')
+    """创建测试音频数据（base64 字符串），相同参数只生成一次"""
+    # 440Hz 正弦波每 sample_rate / gcd(sample_rate, 440) 个采样点精确重复一次，
+    # 只计算一个周期，其余部分按周期平铺复制
+    period = sample_rate // gcd(sample_rate, 440)
+    # 相位、正弦、缩放和取整都在同一个 float32 数组上原地完成，不产生临时数组
+    t = np.arange(period, dtype=np.float32)
+    t *= np.float32(2 * np.pi * 440 / sample_rate)
+    np.sin(t, out=t)
+    t *= np.float32(0.3 * 32767)
+    np.rint(t, out=t)
+    audio_data = np.resize(t.astype(np.int16), int(sample_rate * duration))
+    return binascii.b2a_base64(audio_data.tobytes(), newline=False).decode('ascii')
+
+@lru_cache(maxsize=8)
+def create_audio_frame(duration=3, sample_rate=16000):
+    """创建携带测试音频的结束帧（JSON 文本），相同参数只编码一次
+
+    接口只接受 JSON 文本帧，音频必须以 base64 放在 audio 字段中，不能直接发送二进制帧
+    """
+    return orjson.dumps({
+        "data": {
+            "status": 2,  # 结束状态
+            "audio": create_test_audio(duration, sample_rate),
+            "encoding": "raw"
+        }
+    }).decode('utf-8')
 
 async def test_xunfei_format():
     """测试讯飞API的不同格式"""
     app_id = os.getenv("XUNFEI_APP_ID")
     api_key = os.getenv("XUNFEI_API_KEY")
     api_secret = os.getenv("XUNFEI_API_SECRET")
-    host = "iat-api.xfyun.cn"
-    path = "/v2/iat"
 
     print("=== 讯飞API格式测试 ===")
 
     # 生成认证URL - v2 API需要包含app_id
-    import datetime
-    timestamp = datetime.datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-    signature_origin = f"host: {host}\ndate: {timestamp}\nGET {path} HTTP/1.1\napp_id: {app_id}"
-    signature_sha = hmac.new(
-        api_secret.encode('utf-8'),
-        signature_origin.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    signature = base64.b64encode(signature_sha).decode('utf-8')
+    timestamp = formatdate(usegmt=True)
+    signer = get_hmac_template().copy()
+    signer.update(_SIG_TEMPLATE % timestamp.encode('ascii'))
+    signature_sha = signer.digest()
+    signature = binascii.b2a_base64(signature_sha, newline=False).decode('ascii')
 
     authorization_origin = f'api_key="{api_key}", algorithm="hmac-sha256", headers="host date request-line app_id", signature="{signature}"'
-    authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
+    authorization = binascii.b2a_base64(authorization_origin.encode('utf-8'), newline=False).decode('ascii')
     authorization_enc = quote(authorization)
 
-    uri = f"wss://{host}{path}?authorization={authorization_enc}&date={quote(timestamp)}&host={host}&app_id={app_id}"
+    uri = f"wss://{_HOST}{_PATH}?authorization={authorization_enc}&date={quote(timestamp)}&host={_HOST}&app_id={app_id}"
 
     try:
         print("尝试连接WebSocket...")
-        async with websockets.connect(uri, ping_timeout=30, close_timeout=30) as websocket:
+        async with websockets.connect(uri, ssl=_SSL_CTX, ping_timeout=30, close_timeout=30) as websocket:
             print("✅ WebSocket连接成功！")
 
             # 尝试格式1: 使用我们修正的格式
             print("\n测试格式1: 修正的API格式")
-            test_audio_data = create_test_audio(2)
-
-            format1_message = {
-                "data": {
-                    "status": 0,
-                    "audio": "",
-                    "encoding": "raw"
-                }
-            }
+            # 音频数据随结束帧一起发送
+            audio_frame = create_audio_frame(2)
 
-            await websocket.send(json.dumps(format1_message))
-            print("发送格式1消息...")
+            # 开始帧和音频帧连续发出，不再等待开始帧的响应，省去一次往返
+            await websocket.send(_FORMAT1_FRAME)
+            await websocket.send(audio_frame)
+            print("发送格式1消息和音频数据...")
 
             try:
                 response = await asyncio.wait_for(websocket.recv(), timeout=5)
-                result_data = json.loads(response)
+                result_data = orjson.loads(response)
                 print(f"格式1响应: {result_data}")
 
                 if result_data.get("code") == 0:
-                    print("✅ 格式1成功！尝试发送音频数据...")
-
-                    # 发送音频数据
-                    audio_message = {
-                        "data": {
-                            "status": 2,  # 结束状态
-                            "audio": test_audio_data,
-                            "encoding": "raw"
-                        }
-                    }
-
-                    await websocket.send(json.dumps(audio_message))
-                    print("发送音频数据...")
-
-                    # 等待最终结果
-                    final_response = await asyncio.wait_for(websocket.recv(), timeout=10)
-                    final_data = json.loads(final_response)
-                    print(f"最终结果: {final_data}")
+                    print("✅ 格式1成功！等待最终结果...")
+
+                    # 第一条响应可能已经是最终结果
+                    if result_data.get("data", {}).get("status") != 2:
+                        final_response = await asyncio.wait_for(websocket.recv(), timeout=10)
+                        result_data = orjson.loads(final_response)
+                    print(f"最终结果: {result_data}")
 
                     return True
                 else:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+讯飞API连接探测 - 在同一个事件循环中并发运行调试脚本和详细测试脚本的连接测试
+"""
+
+import os
+import ssl
+import sys
+import asyncio
+
+from test_xunfei_debug import test_xunfei_debug
+from test_xunfei_detailed import test_xunfei_connection
+
+
+async def main():
+    """并发执行两个连接测试，共用一个 SSL 上下文"""
+    print("讯飞API连接探测程序")
+    print("=" * 50)
+
+    # 检查环境变量
+    required_vars = ['XUNFEI_APP_ID', 'XUNFEI_API_KEY', 'XUNFEI_API_SECRET']
+    missing_vars = [var for var in required_vars if not os.getenv(var)]
+
+    if missing_vars:
+        print(f"❌ 缺少环境变量: {', '.join(missing_vars)}")
+        return False
+
+    # 证书只加载一次，两个连接共用
+    ssl_context = ssl.create_default_context()
+    results = await asyncio.gather(
+        test_xunfei_debug(ssl_context),
+        test_xunfei_connection(ssl_context),
+    )
+
+    for name, success in zip(("调试测试 (rtasr)", "连接测试 (iat)"), results):
+        print(f"{'✅' if success else '❌'} {name}")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
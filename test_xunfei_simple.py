@@ -5,18 +5,22 @@
 
 import os
 import sys
+import asyncio
+
+import websockets
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from src.transcription.xunfei import XunfeiProcessor
+
 def test_websocket_connection():
     """测试WebSocket连接"""
     print("🔌 测试讯飞WebSocket连接...")
 
     try:
-        from src.transcription.xunfei import XunfeiProcessor
         processor = XunfeiProcessor()
 
         # 生成认证URL
@@ -24,19 +28,14 @@ def test_websocket_connection():
         print(f"认证URL: {auth_url[:50]}...")
 
         # 尝试建立WebSocket连接
-        import websockets
-        import asyncio
-
         async def test_connection():
             try:
                 # 设置较短的超时时间用于测试
-                async with websockets.connect(auth_url, ping_timeout=5, close_timeout=5) as websocket:
+                async with websockets.connect(auth_url, ssl=processor._ssl_context, ping_timeout=5, close_timeout=5) as websocket:
                     print("✅ WebSocket连接建立成功")
 
                     # 发送开始消息
-                    start_msg = processor._create_start_message()
-                    import json
-                    await websocket.send(json.dumps(start_msg))
+                    await websocket.send(processor._start_frame)
                     print("✅ 开始消息发送成功")
 
                     # 等待响应
@@ -53,12 +52,7 @@ def test_websocket_connection():
                 return False
 
         # 运行测试
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        success = loop.run_until_complete(test_connection())
-        loop.close()
-
-        return success
+        return asyncio.run(test_connection())
 
     except Exception as e:
         print(f"❌ 测试失败: {e}")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+讯飞测试脚本共用的签名工具
+"""
+
+import os
+import sys
+import hashlib
+import hmac
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@lru_cache(maxsize=1)
+def get_hmac_template():
+    """返回以 XUNFEI_API_SECRET 为密钥的 HMAC-SHA256 模板，每次签名复制使用
+
+    密钥只处理一次；未设置密钥时直接退出，而不是用空密钥签名后被服务器拒绝
+    """
+    api_secret = os.getenv("XUNFEI_API_SECRET")
+    if not api_secret:
+        sys.exit("❌ 缺少环境变量: XUNFEI_API_SECRET")
+    return hmac.new(api_secret.encode('utf-8'), digestmod=hashlib.sha256)